@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
 import os
 from auth import AuthManager
@@ -199,10 +198,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize managers
-if 'auth_manager' not in st.session_state:
-    st.session_state.auth_manager = AuthManager()
 if 'data_manager' not in st.session_state:
     st.session_state.data_manager = DataManager()
+if 'auth_manager' not in st.session_state:
+    st.session_state.auth_manager = AuthManager(st.session_state.data_manager)
 if 'ui_components' not in st.session_state:
     st.session_state.ui_components = UIComponents()
 if 'report_generator' not in st.session_state:
@@ -277,14 +276,22 @@ def show_main_app():
                     del st.session_state[key]
             st.rerun()
     
-    # Main navigation tabs
+    # Pop up notifications sent to this user while the app is open
+    st.session_state.notification_system.show_live_notifications(user)
+    
+    # Main navigation; unlike st.tabs, only the selected tab's body runs
     tabs = get_user_tabs(user['role'])
-    selected_tab = st.tabs(tabs)
+    if st.session_state.get('active_tab') not in tabs:
+        st.session_state.active_tab = tabs[0]
+    selected_tab = st.radio("메뉴", tabs, key='active_tab', horizontal=True, label_visibility="collapsed")
     
-    # Tab content
-    for i, tab_name in enumerate(tabs):
-        with selected_tab[i]:
-            show_tab_content(tab_name, user)
+    # Tab content reads one per-rerun snapshot of the tables
+    with st.session_state.data_manager.request_context():
+        show_tab_content(selected_tab, user)
+    
+    # Warm the table cache for the next tab in the menu
+    next_tab = tabs[(tabs.index(selected_tab) + 1) % len(tabs)]
+    st.session_state.data_manager.prefetch(TAB_TABLES.get(next_tab, []))
 
 def get_user_tabs(role):
     base_tabs = ["🏠 홈", "📋 게시판", "💬 채팅", "📅 일정"]
@@ -302,6 +309,34 @@ def get_user_tabs(role):
         #return base_tabs + ["📝 과제", "🧠 퀴즈", "🗳️ 투표", "🖼️ 갤러리", "📅 출석", "🔔 알림", "🔍 검색", "👤 마이페이지"]
         return base_tabs + ["📝 과제", "🧠 퀴즈", "🗳️ 투표", "📅 출석", "🔔 알림", "🔍 검색", "👤 마이페이지"]
 
+# Rows rendered per "더 보기" step on the board and schedule tabs
+PAGE_SIZE = 10
+
+def show_more_button(key):
+    # Each click renders one more page of the list stored under key
+    if st.button("더 보기", key=f"{key}_more"):
+        st.session_state[key] = st.session_state.get(key, 1) + 1
+        st.rerun()
+
+# Tables each tab reads, used to prefetch the next tab
+TAB_TABLES = {
+    "🏠 홈": ['clubs', 'assignments', 'points', 'user_clubs'],
+    "📋 게시판": ['posts'],
+    "💬 채팅": ['chat_logs'],
+    "📅 일정": ['schedule'],
+    "📝 과제": ['assignments', 'submissions'],
+    "🧠 퀴즈": ['quizzes', 'quiz_attempts'],
+    "🗳️ 투표": ['votes', 'vote_responses'],
+    "🖼️ 갤러리": ['galleries', 'gallery_comments'],
+    "📅 출석": ['attendance'],
+    "🔔 알림": ['notifications', 'notification_reads'],
+    "🔍 검색": ['posts', 'chat_logs', 'assignments', 'schedule', 'galleries'],
+    "📄 보고서": ['reports'],
+    "📊 관리": ['accounts', 'posts', 'points'],
+    "👥 관리": ['posts', 'assignments'],
+    "👤 마이페이지": ['points', 'posts', 'submissions']
+}
+
 def show_tab_content(tab_name, user):
     if tab_name == "🏠 홈":
         show_home_tab(user)
@@ -346,7 +381,6 @@ def show_home_tab(user):
     
     clubs_df = st.session_state.data_manager.load_csv('clubs')
     assignments_df = st.session_state.data_manager.load_csv('assignments')
-    user_clubs_df = st.session_state.data_manager.load_csv('user_clubs')
     
     with col1:
         st.markdown(f"""
@@ -357,7 +391,7 @@ def show_home_tab(user):
         """, unsafe_allow_html=True)
     
     with col2:
-        my_clubs = user_clubs_df[user_clubs_df['username'] == user['username']]
+        my_clubs = st.session_state.data_manager.user_club_names(user['username'])
         st.markdown(f"""
         <div class="metric-card">
             <h2 style="color: #4ECDC4; margin: 0;">{len(my_clubs)}</h2>
@@ -413,7 +447,7 @@ def show_board_tab(user):
         with st.form("new_post"):
             title = st.text_input("제목")
             content = st.text_area("내용")
-            club_options = ["전체"] + st.session_state.data_manager.get_user_clubs(user['username'])['club_name'].tolist()
+            club_options = ["전체"] + sorted(st.session_state.data_manager.user_club_names(user['username']))
             selected_club = st.selectbox("동아리 선택", club_options)
             
             if st.form_submit_button("게시"):
@@ -425,11 +459,11 @@ def show_board_tab(user):
                     st.session_state.show_post_form = False
                     st.rerun()
     
-    # Display posts
-    posts_df = st.session_state.data_manager.load_csv('posts')
+    # Display posts, newest first, one page at a time
+    posts_df, has_more = st.session_state.data_manager.load_pages(
+        'posts', st.session_state.get('board_pages', 1), order_by='-timestamp', limit=PAGE_SIZE
+    )
     if not posts_df.empty:
-        posts_df = posts_df.sort_values('timestamp', ascending=False)
-        
         for _, post in posts_df.iterrows():
             with st.container():
                 st.markdown(f"""
@@ -439,6 +473,9 @@ def show_board_tab(user):
                     <small>👤 {post['author']} | 📅 {post['timestamp']} | 🏷️ {post['club']}</small>
                 </div>
                 """, unsafe_allow_html=True)
+        
+        if has_more:
+            show_more_button('board_pages')
 
 def show_chat_tab(user):
     st.session_state.chat_system.show_chat_interface(user)
@@ -465,11 +502,10 @@ def show_schedule_tab(user):
                         st.rerun()
     
     # Display schedule
-    schedule_df = st.session_state.data_manager.load_csv('schedule')
+    schedule_df, has_more = st.session_state.data_manager.load_pages(
+        'schedule', st.session_state.get('schedule_pages', 1), order_by='date', limit=PAGE_SIZE
+    )
     if not schedule_df.empty:
-        schedule_df['date'] = pd.to_datetime(schedule_df['date'])
-        schedule_df = schedule_df.sort_values('date')
-        
         for _, event in schedule_df.iterrows():
             with st.container():
                 st.markdown(f"""
@@ -480,6 +516,9 @@ def show_schedule_tab(user):
                     <p><strong>동아리:</strong> {event['club']}</p>
                 </div>
                 """, unsafe_allow_html=True)
+        
+        if has_more:
+            show_more_button('schedule_pages')
 
 def show_assignment_tab(user):
     st.session_state.assignment_system.show_assignment_interface(user)
@@ -558,12 +597,12 @@ def show_account_management():
                     st.rerun()
                 else:
                     st.error("이미 존재하는 아이디입니다.")
-
+    
     # 기존 계정 표시 및 편집
     st.markdown("#### 기존 계정")
     accounts_df = st.session_state.data_manager.load_csv('accounts')
     user_clubs_df = st.session_state.data_manager.load_csv('user_clubs')
-
+    
     if not accounts_df.empty:
         st.markdown("**계정 정보**")
         edited_accounts_df = st.data_editor(
@@ -572,7 +611,7 @@ def show_account_management():
             num_rows="dynamic",
             key="edit_accounts"
         )
-
+        
         st.markdown("**소속 동아리**")
         edited_user_clubs_df = st.data_editor(
             user_clubs_df[['username', 'club_name']],
@@ -580,7 +619,7 @@ def show_account_management():
             num_rows="dynamic",
             key="edit_user_clubs"
         )
-
+        
         if st.button("변경사항 저장"):
             st.session_state.data_manager.save_csv('accounts', edited_accounts_df)
             st.session_state.data_manager.save_csv('user_clubs', edited_user_clubs_df)
@@ -667,7 +706,11 @@ def show_data_management():
         
         for csv_file in csv_files:
             if st.button(f"📁 {csv_file} 다운로드", key=f"download_{csv_file}"):
-                df = st.session_state.data_manager.load_csv(csv_file.replace('.csv', ''))
+                if csv_file == "chat_logs.csv":
+                    # Include the archived chat months in the export
+                    df = st.session_state.data_manager.load_chat_history()
+                else:
+                    df = st.session_state.data_manager.load_csv(csv_file.replace('.csv', ''))
                 csv = df.to_csv(index=False).encode('utf-8-sig')
                 st.download_button(
                     label=f"다운로드 {csv_file}",
@@ -693,13 +736,13 @@ def show_management_tab(user):
     st.markdown("### 👥 동아리 관리")
     
     # Get user's clubs
-    my_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
+    my_clubs = sorted(st.session_state.data_manager.user_club_names(user['username']))
     
-    if my_clubs.empty:
+    if not my_clubs:
         st.info("관리할 동아리가 없습니다.")
         return
     
-    selected_club = st.selectbox("관리할 동아리 선택", my_clubs['club_name'].tolist())
+    selected_club = st.selectbox("관리할 동아리 선택", my_clubs)
     
     if selected_club:
         tab1, tab2, tab3 = st.tabs(["📊 현황", "👥 회원", "📋 활동"])
@@ -717,8 +760,7 @@ def show_club_status(club_name):
     st.markdown(f"#### {club_name} 현황")
     
     # Member count
-    user_clubs_df = st.session_state.data_manager.load_csv('user_clubs')
-    member_count = len(user_clubs_df[user_clubs_df['club_name'] == club_name])
+    member_count = len(st.session_state.data_manager.club_member_names(club_name))
     
     # Posts count
     posts_df = st.session_state.data_manager.load_csv('posts')
@@ -846,7 +888,7 @@ def show_mypage_tab(user):
         my_points = points_df[points_df['username'] == user['username']]['points'].sum() if not points_df.empty else 0
         
         # My clubs
-        my_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
+        my_clubs = st.session_state.data_manager.user_club_names(user['username'])
         
         # My posts
         posts_df = st.session_state.data_manager.load_csv('posts')
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
 
 class AssignmentSystem:
@@ -38,15 +37,12 @@ class AssignmentSystem:
         
         # Filter assignments based on user's clubs
         if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
             assignments_df = assignments_df[
-                (assignments_df['club'].isin(user_club_names)) |
+                st.session_state.data_manager.club_mask('assignments', assignments_df, user) |
                 (assignments_df['creator'] == user['username'])
             ]
         
         # Sort by due date
-        assignments_df['due_date'] = pd.to_datetime(assignments_df['due_date'])
         assignments_df = assignments_df.sort_values('due_date')
         
         for _, assignment in assignments_df.iterrows():
@@ -54,7 +50,7 @@ class AssignmentSystem:
     
     def show_assignment_card(self, assignment, user):
         # Calculate days until due
-        due_date = pd.to_datetime(assignment['due_date'])
+        due_date = assignment['due_date']
         days_left = (due_date.date() - date.today()).days
         
         # Status styling
@@ -95,11 +91,10 @@ class AssignmentSystem:
             
             with col2:
                 # Check if user has submitted
-                submissions_df = st.session_state.data_manager.load_csv('submissions')
-                user_submission = submissions_df[
-                    (submissions_df['assignment_id'] == assignment['id']) &
-                    (submissions_df['username'] == user['username'])
-                ]
+                user_submission = st.session_state.data_manager.query(
+                    'submissions',
+                    where={'assignment_id': assignment['id'], 'username': user['username']}
+                )
                 
                 if not user_submission.empty:
                     st.success("✅ 제출완료")
@@ -137,7 +132,7 @@ class AssignmentSystem:
         with st.expander(form_title, expanded=True):
             with st.form(f"submission_form_{assignment['id']}"):
                 st.markdown(f"**과제:** {assignment['title']}")
-                st.markdown(f"**마감일:** {assignment['due_date']}")
+                st.markdown(f"**마감일:** {assignment['due_date'].strftime('%Y-%m-%d')}")
                 
                 # Pre-fill with existing data if editing
                 default_content = existing_submission['content'] if is_edit else ""
@@ -203,17 +198,16 @@ class AssignmentSystem:
     
     def update_submission(self, submission_id, content, uploaded_file):
         try:
-            submissions_df = st.session_state.data_manager.load_csv('submissions')
-            
             # Update the submission
-            submissions_df.loc[submissions_df['id'] == submission_id, 'content'] = content
-            submissions_df.loc[submissions_df['id'] == submission_id, 'submitted_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            changes = {
+                'content': content,
+                'submitted_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
             
             if uploaded_file is not None:
-                file_path = f"uploads/{uploaded_file.name}"
-                submissions_df.loc[submissions_df['id'] == submission_id, 'file_path'] = file_path
+                changes['file_path'] = f"uploads/{uploaded_file.name}"
             
-            return st.session_state.data_manager.save_csv('submissions', submissions_df)
+            return st.session_state.data_manager.update_by_id('submissions', submission_id, **changes)
         except Exception as e:
             print(f"Submission update error: {e}")
             return False
@@ -232,8 +226,7 @@ class AssignmentSystem:
                     clubs_df = st.session_state.data_manager.load_csv('clubs')
                     club_options = ["전체"] + clubs_df['name'].tolist()
                 else:
-                    user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                    club_options = user_clubs['club_name'].tolist()
+                    club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
                 
                 selected_club = st.selectbox("대상 동아리", club_options)
             
@@ -291,8 +284,7 @@ class AssignmentSystem:
         
         # Filter assignments by user's authority
         if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = user_clubs['club_name'].tolist()
+            user_club_names = st.session_state.data_manager.user_club_names(user['username'])
             assignments_df = assignments_df[
                 (assignments_df['club'].isin(user_club_names)) |
                 (assignments_df['creator'] == user['username'])
@@ -323,11 +315,10 @@ class AssignmentSystem:
             submission_count = len(assignment_submissions)
             
             # Get potential submitters (club members)
-            user_clubs_df = st.session_state.data_manager.load_csv('user_clubs')
             if assignment['club'] == "전체":
                 potential_submitters = len(st.session_state.data_manager.load_csv('accounts'))
             else:
-                potential_submitters = len(user_clubs_df[user_clubs_df['club_name'] == assignment['club']])
+                potential_submitters = len(st.session_state.data_manager.club_member_names(assignment['club']))
             
             submission_rate = (submission_count / max(potential_submitters, 1)) * 100
             
@@ -337,7 +328,7 @@ class AssignmentSystem:
                     <h4>{assignment['title']}</h4>
                     <div style="display: flex; justify-content: space-between; margin: 10px 0;">
                         <span><strong>동아리:</strong> {assignment['club']}</span>
-                        <span><strong>마감일:</strong> {assignment['due_date']}</span>
+                        <span><strong>마감일:</strong> {assignment['due_date'].strftime('%Y-%m-%d')}</span>
                     </div>
                     <div style="background-color: #f8f9fa; padding: 10px; border-radius: 5px;">
                         <p><strong>제출 현황:</strong> {submission_count}/{potential_submitters} ({submission_rate:.1f}%)</p>
@@ -394,9 +385,7 @@ class AssignmentSystem:
     
     def update_submission_score(self, submission_id, score):
         try:
-            submissions_df = st.session_state.data_manager.load_csv('submissions')
-            submissions_df.loc[submissions_df['id'] == submission_id, 'score'] = score
-            return st.session_state.data_manager.save_csv('submissions', submissions_df)
+            return st.session_state.data_manager.update_by_id('submissions', submission_id, score=score)
         except Exception as e:
             print(f"Score update error: {e}")
             return False
@@ -38,8 +38,7 @@ class AttendanceSystem:
             clubs_df = st.session_state.data_manager.load_csv('clubs')
             club_options = clubs_df['name'].tolist()
         else:
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            club_options = user_clubs['club_name'].tolist()
+            club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
         
         if not club_options:
             st.info("관리할 동아리가 없습니다.")
@@ -65,7 +64,7 @@ class AttendanceSystem:
             attendance_df = st.session_state.data_manager.load_csv('attendance')
             existing_attendance = attendance_df[
                 (attendance_df['club'] == selected_club) & 
-                (attendance_df['date'] == selected_date.strftime('%Y-%m-%d'))
+                (attendance_df['date'] == pd.Timestamp(selected_date))
             ]
             
             st.markdown(f"##### {selected_club} - {selected_date} 출석 체크")
@@ -89,42 +88,36 @@ class AttendanceSystem:
                         )
                 
                 if st.form_submit_button("📝 출석 저장", use_container_width=True):
-                    success_count = 0
-                    for username, status in attendance_data.items():
-                        if self.save_attendance(username, selected_club, selected_date, status, user['username']):
-                            success_count += 1
+                    success_count = self.save_attendance_records(
+                        selected_club, selected_date, attendance_data, user['username']
+                    )
                     
                     st.success(f"{success_count}명의 출석이 저장되었습니다!")
                     st.rerun()
     
     def save_attendance(self, username, club, date, status, recorder):
         try:
-            attendance_df = st.session_state.data_manager.load_csv('attendance')
-            
-            # Check if record exists
-            existing_record = attendance_df[
-                (attendance_df['username'] == username) & 
-                (attendance_df['club'] == club) & 
-                (attendance_df['date'] == date.strftime('%Y-%m-%d'))
-            ]
+            data_manager = st.session_state.data_manager
             
-            if not existing_record.empty:
-                # Update existing record
-                attendance_df.loc[
-                    (attendance_df['username'] == username) & 
-                    (attendance_df['club'] == club) & 
-                    (attendance_df['date'] == date.strftime('%Y-%m-%d')),
-                    'status'
-                ] = status
-                attendance_df.loc[
-                    (attendance_df['username'] == username) & 
-                    (attendance_df['club'] == club) & 
-                    (attendance_df['date'] == date.strftime('%Y-%m-%d')),
-                    'recorder'
-                ] = recorder
-            else:
+            # Hold the table so two recorders can't both insert the same record
+            with data_manager.table_lock('attendance'):
+                attendance_df = data_manager.load_csv('attendance')
+                
+                def record_mask(df):
+                    return (
+                        (df['username'] == username) & 
+                        (df['club'] == club) & 
+                        (df['date'] == pd.Timestamp(date))
+                    )
+                
+                if not attendance_df.empty and record_mask(attendance_df).any():
+                    # Update existing record
+                    return data_manager.update(
+                        'attendance', record_mask, {'status': status, 'recorder': recorder}
+                    )
+                
                 # Create new record
-                new_id = len(attendance_df) + 1
+                new_id = data_manager.next_id('attendance')
                 new_record = {
                     'id': new_id,
                     'username': username,
@@ -134,14 +127,69 @@ class AttendanceSystem:
                     'recorder': recorder
                 }
                 
-                attendance_df = pd.concat([attendance_df, pd.DataFrame([new_record])], ignore_index=True)
-            
-            return st.session_state.data_manager.save_csv('attendance', attendance_df)
+                return data_manager.append_row('attendance', new_record)
         
         except Exception as e:
             print(f"Attendance save error: {e}")
             return False
     
+    def save_attendance_records(self, club, date, attendance_data, recorder):
+        try:
+            data_manager = st.session_state.data_manager
+            date_str = date.strftime('%Y-%m-%d')
+            
+            # Hold the table so two recorders can't both insert the same records
+            with data_manager.table_lock('attendance'):
+                attendance_df = data_manager.load_csv('attendance')
+                
+                existing_users = set()
+                if not attendance_df.empty:
+                    day_mask = (attendance_df['club'] == club) & (attendance_df['date'] == pd.Timestamp(date))
+                    existing_users = set(attendance_df.loc[day_mask, 'username'])
+                
+                # Update existing records with a single rewrite
+                updated_users = [username for username in attendance_data if username in existing_users]
+                if updated_users:
+                    updated = data_manager.update(
+                        'attendance',
+                        lambda df: (
+                            (df['club'] == club) & 
+                            (df['date'] == pd.Timestamp(date)) & 
+                            df['username'].isin(updated_users)
+                        ),
+                        {
+                            'status': lambda rows: rows['username'].map(attendance_data),
+                            'recorder': recorder
+                        }
+                    )
+                    if not updated:
+                        return 0
+                
+                # Append new records with one reserved block of IDs
+                new_users = [username for username in attendance_data if username not in existing_users]
+                if new_users:
+                    new_ids = data_manager.reserve_ids('attendance', len(new_users))
+                    new_records = [
+                        {
+                            'id': new_id,
+                            'username': username,
+                            'club': club,
+                            'date': date_str,
+                            'status': attendance_data[username],
+                            'recorder': recorder
+                        }
+                        for username, new_id in zip(new_users, new_ids)
+                    ]
+                    
+                    if not data_manager.append_rows('attendance', new_records):
+                        return len(updated_users)
+            
+            return len(attendance_data)
+        
+        except Exception as e:
+            print(f"Attendance save error: {e}")
+            return 0
+    
     def show_attendance_status(self, user):
         st.markdown("#### 📊 출석 현황")
         
@@ -157,8 +205,7 @@ class AttendanceSystem:
             clubs_df = st.session_state.data_manager.load_csv('clubs')
             club_options = ["전체"] + clubs_df['name'].tolist()
         else:
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            club_options = ["전체"] + user_clubs['club_name'].tolist()
+            club_options = ["전체"] + sorted(st.session_state.data_manager.user_club_names(user['username']))
         
         selected_club = st.selectbox("동아리", club_options)
         
@@ -170,7 +217,6 @@ class AttendanceSystem:
             return
         
         # Filter by date range
-        attendance_df['date'] = pd.to_datetime(attendance_df['date'])
         filtered_attendance = attendance_df[
             (attendance_df['date'] >= pd.to_datetime(start_date)) &
             (attendance_df['date'] <= pd.to_datetime(end_date))
@@ -221,30 +267,28 @@ class AttendanceSystem:
     def show_attendance_statistics(self, user):
         st.markdown("#### 📈 출석 통계")
         
-        attendance_df = st.session_state.data_manager.load_csv('attendance')
+        attendance_df = st.session_state.data_manager.load(
+            'attendance', columns=['username', 'club', 'date', 'status']
+        )
         
         if attendance_df.empty:
             st.info("출석 통계를 생성할 데이터가 없습니다.")
             return
         
         # Filter by user's authority
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = user_clubs['club_name'].tolist()
-            attendance_df = attendance_df[attendance_df['club'].isin(user_club_names)]
+        attendance_df = st.session_state.data_manager.filter_visible('attendance', attendance_df, user)
         
         # Monthly attendance trend
-        attendance_df['date'] = pd.to_datetime(attendance_df['date'])
         attendance_df['month'] = attendance_df['date'].dt.to_period('M')
         
-        monthly_stats = attendance_df.groupby(['month', 'status']).size().unstack(fill_value=0)
+        monthly_stats = attendance_df.groupby(['month', 'status'], observed=False).size().unstack(fill_value=0)
         
         if not monthly_stats.empty:
             st.markdown("##### 월별 출석 현황")
             st.bar_chart(monthly_stats)
         
         # Club-wise attendance rate
-        club_stats = attendance_df.groupby(['club', 'status']).size().unstack(fill_value=0)
+        club_stats = attendance_df.groupby(['club', 'status'], observed=True).size().unstack(fill_value=0)
         
         if not club_stats.empty:
             # Calculate attendance rates
@@ -264,7 +308,7 @@ class AttendanceSystem:
                     st.metric("총 기록", club_stats.loc[club, '총계'])
         
         # Individual attendance summary
-        user_stats = attendance_df.groupby(['username', 'status']).size().unstack(fill_value=0)
+        user_stats = attendance_df.groupby(['username', 'status'], observed=False).size().unstack(fill_value=0)
         
         if not user_stats.empty:
             accounts_df = st.session_state.data_manager.load_csv('accounts')
@@ -336,7 +380,6 @@ class AttendanceSystem:
         current_year = datetime.now().year
         
         # Filter attendance for selected month
-        my_attendance['date'] = pd.to_datetime(my_attendance['date'])
         month_attendance = my_attendance[
             (my_attendance['date'].dt.year == current_year) &
             (my_attendance['date'].dt.month == current_month)
@@ -3,8 +3,10 @@ import os
 from datetime import datetime
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, data_manager=None):
         self.accounts_file = 'data/accounts.csv'
+        # Read accounts through the DataManager backend when one is given
+        self.data_manager = data_manager
         self.ensure_data_directory()
         self.initialize_accounts()
     
@@ -13,7 +15,12 @@ class AuthManager:
             os.makedirs('data')
     
     def initialize_accounts(self):
-        if not os.path.exists(self.accounts_file):
+        if self.data_manager is not None:
+            needs_accounts = self.data_manager.load_csv('accounts').empty
+        else:
+            needs_accounts = not os.path.exists(self.accounts_file)
+        
+        if needs_accounts:
             # Create initial accounts
             initial_accounts = [
                 {
@@ -75,11 +82,22 @@ class AuthManager:
             ]
             
             df = pd.DataFrame(initial_accounts)
-            df.to_csv(self.accounts_file, index=False, encoding='utf-8-sig')
+            self.save_accounts(df)
+    
+    def load_accounts(self):
+        if self.data_manager is not None:
+            return self.data_manager.load_csv('accounts')
+        return pd.read_csv(self.accounts_file, encoding='utf-8-sig')
+    
+    def save_accounts(self, df):
+        if self.data_manager is not None:
+            return self.data_manager.save_csv('accounts', df)
+        df.to_csv(self.accounts_file, index=False, encoding='utf-8-sig')
+        return True
     
     def login(self, username, password):
         try:
-            df = pd.read_csv(self.accounts_file, encoding='utf-8-sig')
+            df = self.load_accounts()
             user = df[(df['username'] == username) & (df['password'] == password)]
             
             if not user.empty:
@@ -91,7 +109,7 @@ class AuthManager:
     
     def create_account(self, username, password, name, role):
         try:
-            df = pd.read_csv(self.accounts_file, encoding='utf-8-sig')
+            df = self.load_accounts()
             
             # Check if username already exists
             if username in df['username'].values:
@@ -106,14 +124,13 @@ class AuthManager:
             }
             
             df = pd.concat([df, pd.DataFrame([new_account])], ignore_index=True)
-            df.to_csv(self.accounts_file, index=False, encoding='utf-8-sig')
-            return True
+            return self.save_accounts(df)
         except Exception as e:
             print(f"Account creation error: {e}")
             return False
     
     def get_all_accounts(self):
         try:
-            return pd.read_csv(self.accounts_file, encoding='utf-8-sig')
+            return self.load_accounts()
         except:
             return pd.DataFrame()
@@ -0,0 +1,108 @@
+import pandas as pd
+import os
+import threading
+from urllib.parse import quote, unquote
+from schemas import apply_schema, csv_dtypes
+
+# Messages older than this move from chat_logs to the archive
+CHAT_HOT_DAYS = 90
+# How often (seconds) each process checks for messages to archive
+ARCHIVE_CHECK_INTERVAL = 3600
+
+# partition path -> (mtime_ns, DataFrame), shared by every session
+_partition_cache = {}
+_partition_cache_lock = threading.Lock()
+
+class ChatArchive:
+    """Cold tier for chat history: gzip-compressed CSV partitions, one per
+    club and month, under data/archive/chat_logs/<club>/<YYYY-MM>.csv.gz"""
+    
+    def __init__(self, data_dir, write_atomic):
+        self.archive_dir = os.path.join(data_dir, 'archive', 'chat_logs')
+        # DataManager.write_atomic: partitions are fsynced before chat_logs
+        # drops the rows they hold
+        self.write_atomic = write_atomic
+    
+    def partition_path(self, club, month):
+        # Club names are user input; keep them to one path component
+        return os.path.join(self.archive_dir, quote(str(club), safe=''), f'{month}.csv.gz')
+    
+    def partitions(self, clubs=None):
+        """(club, month, path) of every partition, optionally only for clubs"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        
+        result = []
+        for club_dir in sorted(os.listdir(self.archive_dir)):
+            club = unquote(club_dir)
+            if clubs is not None and club not in clubs:
+                continue
+            
+            for name in sorted(os.listdir(os.path.join(self.archive_dir, club_dir))):
+                if name.endswith('.csv.gz'):
+                    result.append((club, name[:-len('.csv.gz')], os.path.join(self.archive_dir, club_dir, name)))
+        return result
+    
+    def add(self, df):
+        """Merge messages into their partitions; rows already archived (same
+        id) are replaced, so a retried archive run is harmless"""
+        months = df['timestamp'].dt.strftime('%Y-%m')
+        for (club, month), rows in df.groupby([df['club'].astype(str), months], sort=False):
+            path = self.partition_path(club, month)
+            existing = self.read_partition(path)
+            if existing is not None:
+                rows = pd.concat([existing, rows], ignore_index=True).drop_duplicates('id', keep='last')
+            
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.write_partition(path, rows.sort_values('id'))
+    
+    def update(self, message_id, changes):
+        """Set columns of an archived message; returns whether it was found"""
+        for _, _, path in self.partitions():
+            df = self.read_partition(path)
+            if df is None or not (df['id'] == message_id).any():
+                continue
+            
+            for col, value in changes.items():
+                df.loc[df['id'] == message_id, col] = value
+            self.write_partition(path, df)
+            return True
+        return False
+    
+    def write_partition(self, path, df):
+        self.write_atomic(
+            path,
+            lambda f: df.to_csv(f, index=False, encoding='utf-8-sig', compression='gzip'),
+            encoding=None,
+            backup=False
+        )
+    
+    def version(self):
+        # Changes whenever a partition is added or rewritten
+        return tuple((path, os.stat(path).st_mtime_ns) for _, _, path in self.partitions())
+    
+    def read(self, clubs=None, columns=None):
+        frames = [self.read_partition(path) for _, _, path in self.partitions(clubs)]
+        frames = [frame for frame in frames if frame is not None and not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return df[columns] if columns else df
+    
+    def read_partition(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        with _partition_cache_lock:
+            entry = _partition_cache.get(path)
+        
+        if entry is None or entry[0] != mtime:
+            df = pd.read_csv(path, encoding='utf-8-sig', dtype=csv_dtypes('chat_logs'), compression='gzip')
+            entry = (mtime, apply_schema('chat_logs', df))
+            with _partition_cache_lock:
+                _partition_cache[path] = entry
+        
+        return entry[1].copy(deep=False)
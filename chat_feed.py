@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+
+# Recent messages kept per club; anything older is read from the table
+RING_SIZE = 200
+
+class ChatFeed:
+    """The most recent chat messages of each club in fixed-size ring
+    buffers, ordered by id, so polling clients fetch only what was posted
+    after the last message they saw"""
+    
+    def __init__(self, df, offset=0):
+        # club -> deque of message records, oldest first
+        self.rings = {}
+        self.last_id = 0
+        # CSV byte offset up to which the table has been read
+        self.offset = offset
+        self.lock = threading.Lock()
+        
+        if not df.empty:
+            self.extend(df.groupby('club', observed=True, sort=False).tail(RING_SIZE))
+    
+    def extend(self, df):
+        if df.empty:
+            return
+        
+        with self.lock:
+            for record in df.sort_values('id').to_dict('records'):
+                # Tails read from a CSV may overlap rows already seen
+                if record['id'] <= self.last_id:
+                    continue
+                self.rings.setdefault(record['club'], deque(maxlen=RING_SIZE)).append(record)
+                self.last_id = record['id']
+    
+    def since(self, clubs, last_id):
+        """Records newer than last_id in clubs (None for every club), oldest
+        first"""
+        records = []
+        with self.lock:
+            rings = self.rings.values() if clubs is None else [self.rings[club] for club in clubs if club in self.rings]
+            for ring in rings:
+                # Walk back from the newest entry; costs O(new messages)
+                for i in range(len(ring) - 1, -1, -1):
+                    if ring[i]['id'] <= last_id:
+                        break
+                    records.append(ring[i])
+        
+        records.sort(key=lambda record: record['id'])
+        return records
@@ -1,6 +1,14 @@
 import streamlit as st
-import pandas as pd
+import time
 from datetime import datetime
+from message_bus import get_message_bus, chat_topic
+
+# Messages rendered per page; older pages load on demand
+CHAT_PAGE_SIZE = 50
+# Seconds between checks for new messages
+CHAT_POLL_SECONDS = 3
+# Seconds between checks of the table for messages the bus didn't carry
+CHAT_SYNC_SECONDS = 30
 
 class ChatSystem:
     def __init__(self):
@@ -14,8 +22,7 @@ class ChatSystem:
             clubs_df = st.session_state.data_manager.load_csv('clubs')
             available_clubs = ["전체"] + clubs_df['name'].tolist()
         else:
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            available_clubs = ["전체"] + user_clubs['club_name'].tolist()
+            available_clubs = ["전체"] + sorted(st.session_state.data_manager.user_club_names(user['username']))
         
         # Chat room selection
         selected_club = st.selectbox("채팅방 선택", available_clubs)
@@ -43,37 +50,88 @@ class ChatSystem:
                 st.rerun()
     
     def display_chat_messages(self, club, user):
-        chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
-        
-        if chat_logs_df.empty:
-            st.info("아직 채팅 메시지가 없습니다. 첫 메시지를 보내보세요!")
-            return
+        data_manager = st.session_state.data_manager
         
         # Filter messages by club
         if club == "전체":
             # Show all messages user has access to
-            if user['role'] == '선생님':
-                filtered_messages = chat_logs_df
-            else:
-                user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-                filtered_messages = chat_logs_df[chat_logs_df['club'].isin(user_club_names)]
+            visible = data_manager.visible_clubs(user)
+            where = {} if visible is None else {'club': visible}
         else:
-            filtered_messages = chat_logs_df[chat_logs_df['club'] == club]
+            where = {'club': club}
         
         # Filter out deleted messages (except for admins)
         if user['role'] != '선생님':
-            filtered_messages = filtered_messages[filtered_messages['deleted'] == False]
+            where['deleted'] = False
+        
+        # Subscribe before reading the history so no message falls in between
+        live = self.live_state(club, user)
+        live['subscription'].drain()
         
-        # Sort by timestamp
-        filtered_messages = filtered_messages.sort_values('timestamp')
+        # Newest pages first; older ones are loaded on demand
+        pages_key = f"chat_pages_{club}"
+        messages, has_more = data_manager.load_pages(
+            'chat_logs', st.session_state.get(pages_key, 1), order_by='-timestamp', limit=CHAT_PAGE_SIZE, where=where
+        )
         
-        if filtered_messages.empty:
+        # Messages after these arrive through the live fragment below
+        live['last_id'] = int(messages['id'].max()) if not messages.empty else 0
+        live['messages'] = []
+        live['synced'] = time.monotonic()
+        
+        if messages.empty:
             st.info(f"{club} 채팅방에 메시지가 없습니다.")
-            return
+        else:
+            if has_more and st.button("⬆️ 이전 메시지 더 보기", key=f"{pages_key}_more"):
+                st.session_state[pages_key] = st.session_state.get(pages_key, 1) + 1
+                st.rerun()
+            
+            # Display messages, oldest at the top
+            for _, message in messages.iloc[::-1].iterrows():
+                self.display_message(message, user)
         
-        # Display messages
-        for _, message in filtered_messages.iterrows():
+        self.display_new_messages(club, user)
+    
+    def live_state(self, club, user):
+        # The session's bus subscription for the rooms shown under club
+        data_manager = st.session_state.data_manager
+        if club != "전체":
+            clubs = {club}
+        else:
+            clubs = data_manager.visible_clubs(user)
+            if clubs is None:
+                clubs = {"전체"} | set(data_manager.load_csv('clubs')['name'])
+        topics = {chat_topic(c) for c in clubs}
+        
+        live = st.session_state.get('chat_live')
+        if live is None or live['subscription'].closed or live['subscription'].topics != topics:
+            if live is not None:
+                live['subscription'].close()
+            live = {'clubs': clubs, 'subscription': get_message_bus().subscribe(topics)}
+            st.session_state.chat_live = live
+        return live
+    
+    @st.fragment(run_every=CHAT_POLL_SECONDS)
+    def display_new_messages(self, club, user):
+        # Reruns on its own timer without rerunning the app; new messages are
+        # pushed to the session's subscription by send_message
+        live = st.session_state.chat_live
+        
+        new_messages = [message for _, message in live['subscription'].drain()]
+        
+        # Messages saved by other server processes only reach an in-process
+        # bus's sessions through the table, so check it now and then
+        if not get_message_bus().shared and time.monotonic() - live['synced'] >= CHAT_SYNC_SECONDS:
+            live['synced'] = time.monotonic()
+            since = st.session_state.data_manager.messages_since(live['clubs'], live['last_id'])
+            new_messages.extend(since.to_dict('records'))
+        
+        for message in sorted(new_messages, key=lambda message: message['id']):
+            if message['id'] > live['last_id']:
+                live['messages'].append(message)
+                live['last_id'] = message['id']
+        
+        for message in live['messages']:
             self.display_message(message, user)
     
     def display_message(self, message, current_user):
@@ -122,26 +180,23 @@ class ChatSystem:
                     st.rerun()
     
     def send_message(self, username, message, club):
-        success = st.session_state.data_manager.add_chat_message(username, message, club)
-        if success:
+        saved = st.session_state.data_manager.add_chat_message(username, message, club)
+        if saved:
+            get_message_bus().publish(chat_topic(club), saved)
             st.success("메시지가 전송되었습니다!")
         else:
             st.error("메시지 전송에 실패했습니다.")
     
     def delete_message(self, message_id):
         try:
-            chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
-            
             # Mark message as deleted instead of actually deleting
-            chat_logs_df.loc[chat_logs_df['id'] == message_id, 'deleted'] = True
-            
-            success = st.session_state.data_manager.save_csv('chat_logs', chat_logs_df)
+            success = st.session_state.data_manager.update_chat_message(message_id, deleted=True)
             
             if success:
                 st.success("메시지가 삭제되었습니다.")
             else:
                 st.error("메시지 삭제에 실패했습니다.")
-                
+        
         except Exception as e:
             st.error(f"메시지 삭제 중 오류가 발생했습니다: {e}")
     
@@ -165,7 +220,10 @@ class ChatSystem:
             self.show_chat_search()
     
     def show_chat_statistics(self):
-        chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
+        # Covers the archived months as well as the recent messages
+        chat_logs_df = st.session_state.data_manager.load_chat_history(
+            columns=['username', 'club', 'timestamp', 'deleted']
+        )
         
         if chat_logs_df.empty:
             st.info("채팅 통계가 없습니다.")
@@ -178,11 +236,12 @@ class ChatSystem:
         
         # Message count by club
         club_message_counts = chat_logs_df['club'].value_counts()
+        club_message_counts = club_message_counts[club_message_counts > 0]
         st.markdown("##### 동아리별 메시지 수")
         st.bar_chart(club_message_counts)
         
         # Daily activity
-        chat_logs_df['date'] = pd.to_datetime(chat_logs_df['timestamp']).dt.date
+        chat_logs_df['date'] = chat_logs_df['timestamp'].dt.date
         daily_counts = chat_logs_df['date'].value_counts().sort_index()
         st.markdown("##### 일별 채팅 활동")
         st.line_chart(daily_counts)
@@ -207,7 +266,7 @@ class ChatSystem:
             st.metric("일평균 메시지", f"{avg_daily:.1f}")
     
     def show_deleted_messages(self):
-        chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
+        chat_logs_df = st.session_state.data_manager.load_chat_history()
         deleted_messages = chat_logs_df[chat_logs_df['deleted'] == True]
         
         if deleted_messages.empty:
@@ -236,7 +295,7 @@ class ChatSystem:
         search_term = st.text_input("검색어를 입력하세요")
         
         if search_term:
-            chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
+            chat_logs_df = st.session_state.data_manager.load_chat_history()
             
             # Search in messages
             search_results = chat_logs_df[
@@ -260,15 +319,12 @@ class ChatSystem:
     
     def restore_message(self, message_id):
         try:
-            chat_logs_df = st.session_state.data_manager.load_csv('chat_logs')
-            chat_logs_df.loc[chat_logs_df['id'] == message_id, 'deleted'] = False
-            
-            success = st.session_state.data_manager.save_csv('chat_logs', chat_logs_df)
+            success = st.session_state.data_manager.update_chat_message(message_id, deleted=False)
             
             if success:
                 st.success("메시지가 복구되었습니다.")
             else:
                 st.error("메시지 복구에 실패했습니다.")
-                
+        
         except Exception as e:
             st.error(f"메시지 복구 중 오류가 발생했습니다: {e}")
@@ -1,43 +1,129 @@
 import pandas as pd
+import numpy as np
 import os
+import io
+import csv
+import json
+import shutil
+import tempfile
+import threading
+import random
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from sqlite_store import SQLiteStore, migrate_csv_directory
+from snapshot_store import SnapshotStore
+from write_queue import WriteBehindQueue
+from membership import MembershipIndex
+from chat_feed import ChatFeed
+from chat_archive import ChatArchive, CHAT_HOT_DAYS, ARCHIVE_CHECK_INTERVAL
+from schemas import TABLE_COLUMNS, apply_schema, csv_dtypes
+
+# fcntl is POSIX-only; elsewhere table locks only cover this process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Cached tables are handed out as shallow copies; copy-on-write keeps callers
+# from mutating the shared frame (always enabled from pandas 3 onwards).
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Process-wide table cache shared by every session's DataManager.
+# filepath -> ((inode, mtime_ns, size), DataFrame)
+_table_cache = {}
+_table_cache_lock = threading.Lock()
+
+# filepath -> ((inode, mtime_ns, size), pd.Index of the 'id' column), used
+# to find a row's offset without scanning the table
+_id_index_cache = {}
+
+# Guards the per-table ID sequences in data/sequences.json
+_sequence_lock = threading.Lock()
+
+# Per-table locks; the fcntl lock files under data/locks extend them to
+# other server processes. _held_locks makes table_lock re-entrant per thread.
+_table_locks = {}
+_table_locks_guard = threading.Lock()
+_held_locks = threading.local()
+
+# Attempts before a version-checked update gives up on a busy table
+UPDATE_RETRIES = 5
+
+# Tables the membership index is built from
+MEMBERSHIP_TABLES = ('user_clubs',)
+
+# (data_dir, backend) -> (table versions, MembershipIndex)
+_membership_cache = {}
+_membership_lock = threading.Lock()
+
+# (data_dir, backend) -> (chat_logs version, ChatFeed)
+_chat_feeds = {}
+_chat_feeds_lock = threading.Lock()
+
+# (data_dir, backend) -> time of the last chat archive check
+_chat_archive_checks = {}
+_chat_archive_lock = threading.Lock()
+
+# One write-behind queue per data directory and backend, shared by sessions
+_write_queues = {}
+_write_queues_lock = threading.Lock()
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, backend=None, write_behind=None):
         self.data_dir = 'data'
+        # 'csv' (default) or 'sqlite', overridable with CLUB_DATA_BACKEND
+        self.backend = backend or os.environ.get('CLUB_DATA_BACKEND', 'csv')
+        self.store = None
+        self.snapshots = SnapshotStore(self.data_dir)
+        self.chat_archive = ChatArchive(self.data_dir, self.write_atomic)
+        self.write_queue = None
+        # (table, column, username) -> (table version, visible clubs, categories, allowed codes)
+        self.scope_cache = {}
+        # Tables read during the current script run; see request_context
+        self.request_tables = None
         self.ensure_data_directory()
-        self.initialize_csv_files()
+        
+        if self.backend == 'sqlite':
+            self.initialize_sqlite_store()
+        else:
+            self.initialize_csv_files()
+        
+        # Opt-in: appends and updates are written by a background thread
+        if write_behind is None:
+            write_behind = os.environ.get('CLUB_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+        if write_behind:
+            with _write_queues_lock:
+                key = (os.path.abspath(self.data_dir), self.backend)
+                if key not in _write_queues:
+                    _write_queues[key] = WriteBehindQueue(self)
+                self.write_queue = _write_queues[key]
+        
+        self.check_chat_archive()
     
     def ensure_data_directory(self):
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
-    def initialize_csv_files(self):
-        csv_files = {
-            'clubs': ['name', 'icon', 'description', 'president', 'max_members', 'created_date'],
-            'user_clubs': ['username', 'club_name', 'joined_date'],
-            'posts': ['id', 'title', 'content', 'author', 'club', 'timestamp', 'likes'],
-            'chat_logs': ['id', 'username', 'message', 'club', 'timestamp', 'deleted'],
-            'assignments': ['id', 'title', 'description', 'club', 'due_date', 'creator', 'status', 'created_date'],
-            'submissions': ['id', 'assignment_id', 'username', 'content', 'file_path', 'score', 'feedback', 'submitted_date'],
-            'attendance': ['id', 'username', 'club', 'date', 'status', 'recorder'],
-            'schedule': ['id', 'title', 'description', 'date', 'club', 'creator', 'created_date'],
-            'badges': ['id', 'username', 'badge_name', 'description', 'awarded_date', 'awarded_by'],
-            'points': ['id', 'username', 'points', 'reason', 'date', 'awarded_by'],
-            'votes': ['id', 'title', 'description', 'options', 'creator', 'club', 'end_date', 'created_date'],
-            'vote_responses': ['id', 'vote_id', 'username', 'selected_option', 'voted_date'],
-            'quizzes': ['id', 'title', 'description', 'club', 'difficulty', 'time_limit', 'questions', 'creator', 'created_date'],
-            'quiz_attempts': ['id', 'quiz_id', 'username', 'answers', 'score', 'attempted_date'],
-            'galleries': ['id', 'title', 'description', 'image_path', 'author', 'club', 'created_date', 'likes'],
-            'gallery_comments': ['id', 'gallery_id', 'username', 'comment', 'created_date'],
-            'notifications': ['id', 'title', 'content', 'sender', 'recipient', 'category', 'priority', 'created_date'],
-            'notification_reads': ['id', 'notification_id', 'username', 'read_date'],
-            'notification_settings': ['deadline_reminder', 'schedule_reminder', 'new_member_notification', 'chat_mention', 'updated_date'],
-            'user_notification_settings': ['username', 'frequency', 'quiet_hours_enabled', 'quiet_start', 'quiet_end', 'updated_date'],
-            'reports': ['id', 'title', 'content', 'creator', 'club', 'report_date', 'created_date']
-        }
+    def initialize_sqlite_store(self):
+        db_path = os.path.join(self.data_dir, 'club.db')
         
-        for filename, column_list in csv_files.items():
+        # Import the existing CSV tables the first time the database is created
+        if not os.path.exists(db_path):
+            migrate_csv_directory(self.data_dir, db_path, TABLE_COLUMNS)
+        
+        self.store = SQLiteStore(db_path)
+        self.store.create_tables(TABLE_COLUMNS)
+        self.initialize_default_clubs()
+    
+    def initialize_csv_files(self):
+        for filename, column_list in TABLE_COLUMNS.items():
+            # accounts.csv is seeded by AuthManager
+            if filename == 'accounts':
+                continue
+            
             filepath = os.path.join(self.data_dir, f'{filename}.csv')
             if not os.path.exists(filepath):
                 # Create empty DataFrame with specified columns
@@ -49,8 +135,7 @@ class DataManager:
         self.initialize_default_clubs()
     
     def initialize_default_clubs(self):
-        clubs_file = os.path.join(self.data_dir, 'clubs.csv')
-        df = pd.read_csv(clubs_file, encoding='utf-8-sig')
+        df = self.load_csv('clubs')
         
         if df.empty:
             default_clubs = [
@@ -105,7 +190,7 @@ class DataManager:
             ]
             
             df = pd.DataFrame(default_clubs)
-            df.to_csv(clubs_file, index=False, encoding='utf-8-sig')
+            self.save_csv('clubs', df)
             
             # Add some users to clubs
             self.initialize_user_clubs()
@@ -124,26 +209,614 @@ class DataManager:
             {'username': 'member2', 'club_name': '풍선아트', 'joined_date': datetime.now().strftime('%Y-%m-%d')},
         ]
         
-        user_clubs_file = os.path.join(self.data_dir, 'user_clubs.csv')
         df = pd.DataFrame(user_clubs_data)
-        df.to_csv(user_clubs_file, index=False, encoding='utf-8-sig')
+        self.save_csv('user_clubs', df)
     
     def load_csv(self, filename):
+        if self.request_tables is None or self.holds_lock(filename):
+            return self.load_fresh(filename)
+        
+        if filename not in self.request_tables:
+            self.request_tables[filename] = self.load_fresh(filename)
+        return self.request_tables[filename].copy(deep=False)
+    
+    def load_fresh(self, filename):
+        # Pending write-behind appends and updates are overlaid on the table
+        if self.write_queue is not None:
+            return self.write_queue.read(filename)
+        return self.read_table(filename)
+    
+    @contextmanager
+    def request_context(self):
+        """Materialise each table at most once while the block runs, so every
+        tab of one Streamlit rerun reads the same snapshot. Writes through
+        this DataManager drop the written table from the snapshot."""
+        if self.request_tables is not None:
+            yield
+            return
+        
+        self.request_tables = {}
         try:
+            yield
+        finally:
+            self.request_tables = None
+    
+    def prefetch(self, tables):
+        """Parse tables into the process-wide cache on a background thread"""
+        if self.store is not None or not tables:
+            return
+        threading.Thread(target=self.warm_cache, args=(list(tables),), daemon=True).start()
+    
+    def warm_cache(self, tables):
+        for filename in tables:
+            self.read_table(filename)
+    
+    def forget_request_table(self, filename):
+        if self.request_tables is not None:
+            self.request_tables.pop(filename, None)
+    
+    def holds_lock(self, filename):
+        # Read-modify-write under table_lock must see the table as it is on disk
+        held = getattr(_held_locks, 'tables', None)
+        return bool(held and held.get((self.data_dir, filename)))
+    
+    def read_table(self, filename):
+        try:
+            if self.store is not None:
+                return apply_schema(filename, self.store.load(filename))
+            
             filepath = os.path.join(self.data_dir, f'{filename}.csv')
-            return pd.read_csv(filepath, encoding='utf-8-sig')
+            return self.read_cached(filename, filepath)
+        except:
+            return pd.DataFrame()
+    
+    def load(self, filename, columns=None):
+        # Column projection; history tables read only these columns from their snapshot
+        if columns is None or filename in (self.request_tables or ()) or (
+            self.write_queue is not None and self.write_queue.has_pending(filename)
+        ):
+            df = self.load_csv(filename)
+            return df[columns] if columns is not None and not df.empty else df
+        
+        try:
+            if self.store is not None:
+                return apply_schema(filename, self.store.load(filename, columns))
+            
+            filepath = os.path.join(self.data_dir, f'{filename}.csv')
+            version = self.file_version(filepath)
+            with _table_cache_lock:
+                entry = _table_cache.get(filepath)
+            
+            if entry is not None and entry[0] == version:
+                return entry[1][columns]
+            
+            return self.parse_csv(filename, filepath, columns)
         except:
             return pd.DataFrame()
     
     def save_csv(self, filename, df):
+        self.forget_request_table(filename)
+        
+        # df already includes pending writes if it was read through load_csv
+        if self.write_queue is not None:
+            self.write_queue.flush(filename)
+        return self.write_table(filename, df)
+    
+    def write_table(self, filename, df):
         try:
+            if self.store is not None:
+                return self.store.save(filename, df)
+            
             filepath = os.path.join(self.data_dir, f'{filename}.csv')
-            df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            with self.table_lock(filename):
+                self.write_atomic(filepath, lambda f: df.to_csv(f, index=False))
+                self.invalidate_cache(filepath)
+                
+                # A rewrite may change rows the snapshot already covers
+                if self.snapshots.enabled(filename):
+                    self.snapshots.invalidate(filename)
             return True
         except Exception as e:
             print(f"Save error: {e}")
             return False
     
+    def append_row(self, filename, record):
+        return self.append_rows(filename, [record])
+    
+    def append_rows(self, filename, records):
+        self.forget_request_table(filename)
+        if self.write_queue is not None:
+            return self.write_queue.append(filename, records)
+        return self.write_rows(filename, records)
+    
+    def write_rows(self, filename, records):
+        try:
+            if self.store is not None:
+                return self.store.append(filename, records)
+            
+            filepath = os.path.join(self.data_dir, f'{filename}.csv')
+            with self.table_lock(filename):
+                header = self.read_header(filepath)
+                
+                # New columns change the header, so fall back to a full rewrite
+                if header is None or any(col not in header for record in records for col in record):
+                    df = self.read_table(filename)
+                    df = pd.concat([df, pd.DataFrame(records)], ignore_index=True)
+                    return self.write_table(filename, df)
+                
+                with open(filepath, 'a', encoding='utf-8', newline='') as f:
+                    writer = csv.writer(f, lineterminator=os.linesep)
+                    for record in records:
+                        writer.writerow([record.get(col, '') for col in header])
+                
+                self.invalidate_cache(filepath)
+            return True
+        except Exception as e:
+            print(f"Append error: {e}")
+            return False
+    
+    def query(self, filename, where=None, order_by=None, limit=None, columns=None):
+        """Filtered lookup; where maps column -> value (lists/sets mean IN),
+        order_by takes column names with a '-' prefix for descending order"""
+        if self.store is not None and filename not in (self.request_tables or ()) and (
+            self.write_queue is None or not self.write_queue.has_pending(filename)
+        ):
+            try:
+                return apply_schema(filename, self.store.query(filename, where, order_by, limit, columns))
+            except Exception as e:
+                print(f"Query error: {e}")
+                return pd.DataFrame()
+        
+        df = self.load_csv(filename)
+        if df.empty:
+            return df
+        
+        if where:
+            df = df[self.where_mask(df, where)]
+        
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            df = df.sort_values(
+                [col.lstrip('-') for col in order_by],
+                ascending=[not col.startswith('-') for col in order_by]
+            )
+        
+        if limit is not None:
+            df = df.head(limit)
+        
+        if columns:
+            df = df[columns]
+        
+        return df
+    
+    def where_mask(self, df, where):
+        mask = pd.Series(True, index=df.index)
+        for col, value in where.items():
+            if isinstance(value, (list, tuple, set, frozenset)):
+                mask &= df[col].isin(list(value))
+            else:
+                mask &= df[col] == value
+        return mask
+    
+    def load_page(self, filename, order_by='-id', before=None, limit=20, where=None):
+        """One page of a table in order_by order (a column name, '-' prefix for
+        descending), ties broken by id. before is the cursor returned with the
+        previous page; returns (page, cursor for the next page or None)."""
+        # Chat paged newest first continues into the archive
+        if filename == 'chat_logs' and order_by in ('-timestamp', '-id'):
+            return self.load_chat_page(order_by, before, limit, where)
+        return self.load_table_page(filename, order_by, before, limit, where)
+    
+    def load_table_page(self, filename, order_by, before, limit, where):
+        column = order_by.lstrip('-')
+        descending = order_by.startswith('-')
+        
+        if self.store is not None and filename not in (self.request_tables or ()) and (
+            self.write_queue is None or not self.write_queue.has_pending(filename)
+        ):
+            try:
+                page = self.store.page(filename, column, descending, before, limit + 1, where)
+            except Exception as e:
+                print(f"Page error: {e}")
+                return pd.DataFrame(), None
+            
+            # Cursor values stay in their stored form so they compare in SQL
+            cursor = None
+            if len(page) > limit:
+                page = page.head(limit)
+                cursor = (page[column].iloc[-1], page['id'].iloc[-1])
+            return apply_schema(filename, page), cursor
+        
+        df = self.load_csv(filename)
+        if df.empty:
+            return df, None
+        
+        if where:
+            df = df[self.where_mask(df, where)]
+        
+        if before is not None:
+            value, row_id = before
+            if descending:
+                df = df[(df[column] < value) | ((df[column] == value) & (df['id'] < row_id))]
+            else:
+                df = df[(df[column] > value) | ((df[column] == value) & (df['id'] > row_id))]
+        
+        # Only limit + 1 rows are needed, so select them instead of sorting
+        # the whole table; strings (and missing values, which sort last)
+        # still need the full sort
+        selectable = (
+            pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_datetime64_any_dtype(df[column])
+        ) and not df[column].isna().any()
+        if selectable:
+            df = (df.nlargest if descending else df.nsmallest)(limit + 1, [column, 'id'])
+        else:
+            df = df.sort_values([column, 'id'], ascending=not descending).head(limit + 1)
+        
+        cursor = None
+        if len(df) > limit:
+            df = df.head(limit)
+            cursor = (df[column].iloc[-1], df['id'].iloc[-1])
+        return df, cursor
+    
+    def load_chat_page(self, order_by, before, limit, where):
+        # Archived messages are older than every hot one, so the archive is
+        # paged once chat_logs runs out; its cursors are tagged 'archive'
+        if before is None or before[0] != 'archive':
+            page, cursor = self.load_table_page('chat_logs', order_by, before, limit, where)
+            if cursor is not None:
+                return page, cursor
+            before = None
+        else:
+            page = pd.DataFrame()
+            before = before[1:] if before[1] is not None else None
+        
+        clubs = (where or {}).get('club')
+        if clubs is not None and not isinstance(clubs, (list, tuple, set, frozenset)):
+            clubs = [clubs]
+        archived = self.chat_archive.read(clubs)
+        if archived.empty:
+            return page, None
+        
+        # Rows a failed archive run left in both tiers are paged from chat_logs
+        archived = archived[~archived['id'].isin(self.load('chat_logs', ['id'])['id'])]
+        if where:
+            archived = archived[self.where_mask(archived, where)]
+        
+        column = order_by.lstrip('-')
+        if before is not None:
+            value, row_id = before
+            archived = archived[(archived[column] < value) | ((archived[column] == value) & (archived['id'] < row_id))]
+        archived = archived.sort_values([column, 'id'], ascending=False).head(limit + 1 - len(page))
+        
+        frames = [frame for frame in (page, archived) if not frame.empty]
+        if not frames:
+            return page, None
+        rows = pd.concat(frames) if len(frames) > 1 else frames[0]
+        
+        cursor = None
+        if len(rows) > limit:
+            rows = rows.head(limit)
+            # A full page of hot rows continues at the start of the archive
+            if len(page) < limit:
+                cursor = ('archive', rows[column].iloc[-1], rows['id'].iloc[-1])
+            else:
+                cursor = ('archive', None, None)
+        return rows, cursor
+    
+    def load_pages(self, filename, pages, order_by='-id', limit=20, where=None):
+        """The first pages pages concatenated, for "load more" views; returns
+        (rows, whether more rows exist). Read as one page of pages * limit
+        rows, so the table is filtered and ordered once per call."""
+        rows, cursor = self.load_page(filename, order_by, None, pages * limit, where)
+        if rows.empty:
+            return pd.DataFrame(), False
+        return rows, cursor is not None
+    
+    def update(self, filename, predicate, changes):
+        """Version-checked read-modify-write of the rows predicate(df) selects.
+        changes maps column -> new value, or a function of the matching rows
+        returning their new values. The table is read without holding the
+        lock and only written if nobody changed it meanwhile; on a conflict
+        the whole update is retried against the fresh table."""
+        self.forget_request_table(filename)
+        if self.write_queue is not None:
+            return self.write_queue.update(filename, predicate, changes)
+        
+        try:
+            for attempt in range(UPDATE_RETRIES):
+                version = self.table_version(filename)
+                df = self.apply_changes(self.load_fresh(filename), predicate, changes)
+                if df is None:
+                    return False
+                
+                with self.table_lock(filename):
+                    if self.table_version(filename) == version:
+                        return self.save_csv(filename, df)
+                
+                # Back off a little so concurrent writers don't collide again
+                time.sleep(random.uniform(0, 0.02 * (attempt + 1)))
+            
+            # Still contended; hold the table for the last attempt so it can't starve
+            with self.table_lock(filename):
+                df = self.apply_changes(self.load_fresh(filename), predicate, changes)
+                if df is None:
+                    return False
+                return self.save_csv(filename, df)
+        except Exception as e:
+            print(f"Update error: {e}")
+            return False
+    
+    def apply_changes(self, df, predicate, changes):
+        """df with changes applied to the rows predicate(df) selects, or None
+        when it selects none"""
+        if df.empty:
+            return None
+        
+        mask = predicate(df)
+        if not mask.any():
+            return None
+        
+        for col, value in changes.items():
+            if callable(value):
+                value = value(df.loc[mask])
+            df = self.add_categories(df, col, value)
+            df.loc[mask, col] = value
+        return df
+    
+    def add_categories(self, df, col, value):
+        # Categorical columns (club, status, ...) only take known categories
+        if col not in df.columns or not isinstance(df[col].dtype, pd.CategoricalDtype):
+            return df
+        values = value.unique() if isinstance(value, pd.Series) else [value]
+        new = [v for v in values if not pd.isna(v) and v not in df[col].cat.categories]
+        if new:
+            df[col] = df[col].cat.add_categories(new)
+        return df
+    
+    def update_by_id(self, filename, row_id, **changes):
+        """Point update of the row with this id; a callable value receives the
+        current value and returns the new one. SQLite patches the row in place;
+        CSV patches the cached frame by row offset and writes it back without
+        re-parsing the table."""
+        self.forget_request_table(filename)
+        if self.write_queue is not None:
+            return self.write_queue.update(
+                filename,
+                lambda df: df['id'] == row_id,
+                {col: (lambda rows, col=col, f=value: rows[col].map(f)) if callable(value) else value
+                 for col, value in changes.items()}
+            )
+        
+        try:
+            with self.table_lock(filename):
+                if self.store is not None:
+                    return self.store.update_by_id(filename, row_id, changes)
+                
+                filepath = os.path.join(self.data_dir, f'{filename}.csv')
+                version = self.file_version(filepath)
+                df = self.read_cached(filename, filepath)
+                
+                index = self.id_index(filepath, version, df)
+                if row_id not in index:
+                    return False
+                position = index.get_loc(row_id)
+                
+                for col, value in changes.items():
+                    if callable(value):
+                        value = value(df[col].iloc[position])
+                    df = self.add_categories(df, col, value)
+                    df.iloc[position, df.columns.get_loc(col)] = value
+                
+                if not self.write_table(filename, df):
+                    return False
+                
+                # Row offsets are unchanged, so keep the patched frame and its index
+                new_version = self.file_version(filepath)
+                with _table_cache_lock:
+                    _table_cache[filepath] = (new_version, df)
+                    _id_index_cache[filepath] = (new_version, index)
+                return True
+        except Exception as e:
+            print(f"Update error: {e}")
+            return False
+    
+    def id_index(self, filepath, version, df):
+        with _table_cache_lock:
+            entry = _id_index_cache.get(filepath)
+        
+        if entry is None or entry[0] != version:
+            entry = (version, pd.Index(df['id']))
+            with _table_cache_lock:
+                _id_index_cache[filepath] = entry
+        
+        return entry[1]
+    
+    def table_version(self, filename):
+        # Changes whenever the table is rewritten or appended to
+        if self.store is not None:
+            return self.store.version(filename)
+        return self.file_version(os.path.join(self.data_dir, f'{filename}.csv'))
+    
+    def file_version(self, filepath):
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            return None
+        # Atomic rewrites always produce a new inode
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    @contextmanager
+    def table_lock(self, filename):
+        """Exclusive lock on one table, shared by all threads and server
+        processes using this data directory"""
+        held = getattr(_held_locks, 'tables', None)
+        if held is None:
+            held = _held_locks.tables = {}
+        
+        key = (self.data_dir, filename)
+        if held.get(key):
+            held[key] += 1
+            try:
+                yield
+            finally:
+                held[key] -= 1
+            return
+        
+        with _table_locks_guard:
+            lock = _table_locks.setdefault(key, threading.Lock())
+        
+        with lock:
+            lock_file = self.acquire_file_lock(filename)
+            held[key] = 1
+            try:
+                yield
+            finally:
+                held[key] = 0
+                if lock_file is not None:
+                    # Closing the descriptor releases the fcntl lock
+                    lock_file.close()
+    
+    def acquire_file_lock(self, filename):
+        if fcntl is None:
+            return None
+        
+        lock_dir = os.path.join(self.data_dir, 'locks')
+        os.makedirs(lock_dir, exist_ok=True)
+        lock_file = open(os.path.join(lock_dir, f'{filename}.lock'), 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            lock_file.close()
+            raise
+        return lock_file
+    
+    def next_id(self, filename):
+        return self.reserve_ids(filename, 1)[0]
+    
+    def reserve_ids(self, filename, count):
+        # IDs are never reused, even after rows are deleted
+        sequences_file = os.path.join(self.data_dir, 'sequences.json')
+        
+        with _sequence_lock, self.table_lock('sequences'):
+            sequences = {}
+            if os.path.exists(sequences_file):
+                with open(sequences_file, encoding='utf-8') as f:
+                    sequences = json.load(f)
+            
+            if filename not in sequences:
+                # Seed from the existing table the first time a sequence is used;
+                # archived chat keeps its IDs, so they count too
+                df = self.load_chat_history(columns=['id']) if filename == 'chat_logs' else self.load_csv(filename)
+                ids = pd.to_numeric(df['id'], errors='coerce') if 'id' in df.columns else pd.Series(dtype=float)
+                sequences[filename] = int(ids.max()) if ids.notna().any() else 0
+            
+            start = sequences[filename] + 1
+            sequences[filename] += count
+            
+            self.write_atomic(
+                sequences_file,
+                lambda f: json.dump(sequences, f, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+                backup=False
+            )
+        
+        return range(start, start + count)
+    
+    def write_atomic(self, filepath, write, encoding='utf-8-sig', backup=True):
+        """Write through a temp file in the same directory, fsync it and rename
+        it over filepath, so a killed process never leaves a truncated table.
+        write gets a text file, or a binary one when encoding is None."""
+        directory = os.path.dirname(filepath) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp')
+        
+        try:
+            with (open(fd, 'w', encoding=encoding, newline='') if encoding else open(fd, 'wb')) as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            if os.path.exists(filepath):
+                shutil.copymode(filepath, tmp_path)
+                if backup:
+                    self.rotate_backup(filepath)
+            else:
+                os.chmod(tmp_path, 0o644)
+            
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        self.sync_directory(directory)
+    
+    def rotate_backup(self, filepath):
+        # Keep the previous generation as <table>.csv.bak; a hard link costs
+        # no copy since the new version is renamed over the original
+        backup_path = filepath + '.bak'
+        try:
+            if os.path.exists(backup_path):
+                os.remove(backup_path)
+            os.link(filepath, backup_path)
+        except FileExistsError:
+            # Another writer rotated the backup at the same time
+            pass
+        except OSError:
+            shutil.copyfile(filepath, backup_path)
+    
+    def sync_directory(self, directory):
+        # Persist the rename itself; not supported on every platform
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def read_header(self, filepath):
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            return None
+        
+        with open(filepath, encoding='utf-8-sig', newline='') as f:
+            return next(csv.reader(f), None)
+    
+    def parse_csv(self, filename, filepath, columns=None):
+        df = self.snapshots.read(filename, filepath, columns)
+        if df is None:
+            df = pd.read_csv(filepath, encoding='utf-8-sig', usecols=columns, dtype=csv_dtypes(filename, columns))
+        return apply_schema(filename, df)
+    
+    def read_cached(self, filename, filepath):
+        # Reuse the parsed frame until the file changes on disk
+        version = self.file_version(filepath)
+        if version is None:
+            raise FileNotFoundError(filepath)
+        
+        with _table_cache_lock:
+            entry = _table_cache.get(filepath)
+        
+        if entry is None or entry[0] != version:
+            df = self.parse_csv(filename, filepath)
+            entry = (version, df)
+            with _table_cache_lock:
+                _table_cache[filepath] = entry
+        
+        return entry[1].copy(deep=False)
+    
+    def invalidate_cache(self, filepath=None):
+        with _table_cache_lock:
+            if filepath is None:
+                _table_cache.clear()
+                _id_index_cache.clear()
+            else:
+                _table_cache.pop(filepath, None)
+                _id_index_cache.pop(filepath, None)
+    
     def get_user_clubs(self, username):
         user_clubs_df = self.load_csv('user_clubs')
         clubs_df = self.load_csv('clubs')
@@ -155,6 +828,237 @@ class DataManager:
         result = user_clubs.merge(clubs_df, left_on='club_name', right_on='name', how='left')
         return result
     
+    def memberships(self):
+        """Process-wide membership index, rebuilt only when user_clubs changed
+        outside add_user_to_club/delete_club"""
+        versions = self.membership_versions()
+        key = (os.path.abspath(self.data_dir), self.backend)
+        
+        # Queued writes don't change the table versions yet
+        pending = self.write_queue is not None and any(
+            self.write_queue.has_pending(table) for table in MEMBERSHIP_TABLES
+        )
+        if not pending:
+            with _membership_lock:
+                entry = _membership_cache.get(key)
+            if entry is not None and entry[0] == versions:
+                return entry[1]
+        
+        index = MembershipIndex(*(self.load_fresh(table) for table in MEMBERSHIP_TABLES))
+        if not pending:
+            with _membership_lock:
+                _membership_cache[key] = (versions, index)
+        return index
+    
+    def membership_versions(self):
+        return tuple(self.table_version(table) for table in MEMBERSHIP_TABLES)
+    
+    def update_memberships(self, versions, change):
+        # Apply a write we just made to the cached index instead of rebuilding
+        # it, provided the index was current before the write
+        key = (os.path.abspath(self.data_dir), self.backend)
+        with _membership_lock:
+            entry = _membership_cache.get(key)
+            if entry is not None and entry[0] == versions:
+                change(entry[1])
+                _membership_cache[key] = (self.membership_versions(), entry[1])
+    
+    def user_club_names(self, username):
+        return self.memberships().clubs_of(username)
+    
+    def club_member_names(self, club_name):
+        return self.memberships().members_of(club_name)
+    
+    def messages_since(self, clubs, last_id):
+        """Chat messages in clubs (a set of club names, None for every club)
+        with an id above last_id, oldest first"""
+        if self.write_queue is not None and self.write_queue.has_pending('chat_logs'):
+            df = self.load_fresh('chat_logs')
+            if df.empty:
+                return df
+            df = df[df['id'] > last_id]
+            if clubs is not None:
+                df = df[df['club'].isin(list(clubs))]
+            return df.sort_values('id')
+        
+        records = self.chat_feed().since(clubs, last_id)
+        return apply_schema('chat_logs', pd.DataFrame(records, columns=TABLE_COLUMNS['chat_logs']))
+    
+    def chat_feed(self):
+        """Process-wide ring buffers of recent chat messages, extended with
+        just the rows appended since they were last read"""
+        key = (os.path.abspath(self.data_dir), self.backend)
+        version = self.table_version('chat_logs')
+        
+        with _chat_feeds_lock:
+            entry = _chat_feeds.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        
+        feed = entry[1] if entry is not None else None
+        if feed is not None and not self.extend_chat_feed(feed, entry[0], version):
+            feed = None
+        
+        if feed is None:
+            offset = version[2] if self.store is None and version is not None else 0
+            feed = ChatFeed(self.read_table('chat_logs'), offset)
+        
+        with _chat_feeds_lock:
+            _chat_feeds[key] = (version, feed)
+        return feed
+    
+    def extend_chat_feed(self, feed, old_version, version):
+        # False when the table was rewritten rather than appended to
+        try:
+            if self.store is not None:
+                feed.extend(apply_schema('chat_logs', self.store.rows_after('chat_logs', feed.last_id)))
+                return True
+            
+            # Atomic rewrites (edits, deletes) replace the inode
+            if old_version is None or version is None or version[0] != old_version[0] or version[2] < feed.offset:
+                return False
+            
+            filepath = os.path.join(self.data_dir, 'chat_logs.csv')
+            tail, feed.offset = self.read_csv_tail('chat_logs', filepath, feed.offset)
+            feed.extend(tail)
+            return True
+        except Exception as e:
+            print(f"Chat feed error: {e}")
+            return False
+    
+    def read_csv_tail(self, filename, filepath, offset):
+        """Rows appended to a CSV after byte offset, and the offset just past
+        the last complete line read"""
+        with open(filepath, 'rb') as f:
+            header = f.readline()
+            f.seek(offset - 1)
+            if f.read(1) != b'\n':
+                raise ValueError(f"{filepath}: offset {offset} is not at a line start")
+            data = f.read()
+        
+        # A concurrent append may still be writing its last line
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame(), offset
+        
+        df = pd.read_csv(io.BytesIO(header + data[:end]), encoding='utf-8-sig', dtype=csv_dtypes(filename))
+        return apply_schema(filename, df), offset + end
+    
+    def check_chat_archive(self):
+        # Archive old chat at most once per interval in each process
+        key = (os.path.abspath(self.data_dir), self.backend)
+        now = time.monotonic()
+        with _chat_archive_lock:
+            last = _chat_archive_checks.get(key)
+            if last is not None and now - last < ARCHIVE_CHECK_INTERVAL:
+                return
+            _chat_archive_checks[key] = now
+        
+        # Off the session's first render; archiving rewrites chat_logs
+        threading.Thread(target=self.run_chat_archive, daemon=True).start()
+    
+    def run_chat_archive(self):
+        try:
+            self.archive_chat()
+        except Exception as e:
+            print(f"Chat archive error: {e}")
+    
+    def archive_chat(self, days=CHAT_HOT_DAYS):
+        """Move chat messages older than days from chat_logs (the hot tier)
+        into the per-club monthly archive; returns the number moved"""
+        cutoff = pd.Timestamp.now() - pd.Timedelta(days=days)
+        
+        if self.write_queue is not None:
+            self.write_queue.flush('chat_logs')
+        
+        with self.table_lock('chat_logs'):
+            df = self.read_table('chat_logs')
+            if df.empty:
+                return 0
+            
+            old = df['timestamp'] < cutoff
+            if not old.any():
+                return 0
+            
+            # Archive first: a failed rewrite leaves duplicates, which
+            # load_chat_history drops, rather than lost messages
+            self.chat_archive.add(df[old])
+            if not self.write_table('chat_logs', df[~old]):
+                return 0
+        
+        self.forget_request_table('chat_logs')
+        return int(old.sum())
+    
+    def update_chat_message(self, message_id, **changes):
+        """update_by_id for chat messages, which may have been archived"""
+        if self.update_by_id('chat_logs', message_id, **changes):
+            return True
+        with self.table_lock('chat_logs'):
+            return self.chat_archive.update(message_id, changes)
+    
+    def load_chat_history(self, clubs=None, columns=None, fresh=False):
+        """Hot and archived chat messages together, for statistics, search
+        and export; clubs limits which archive partitions are read. fresh
+        skips the request snapshot, for readers on other threads."""
+        read_columns = None if columns is None else list(dict.fromkeys(['id'] + list(columns)))
+        if fresh:
+            hot = self.load_fresh('chat_logs')
+            hot = hot[read_columns] if read_columns and not hot.empty else hot
+        else:
+            hot = self.load('chat_logs', read_columns) if read_columns else self.load_csv('chat_logs')
+        archived = self.chat_archive.read(clubs, read_columns)
+        
+        if archived.empty:
+            df = hot
+        else:
+            df = pd.concat([archived, hot], ignore_index=True) if not hot.empty else archived
+            df = apply_schema('chat_logs', df.drop_duplicates('id', keep='last'))
+        
+        if clubs is not None and not df.empty:
+            df = df[df['club'].isin(list(clubs))]
+        return df[columns] if columns is not None and not df.empty else df
+    
+    def visible_clubs(self, user):
+        """Clubs whose content the user may see, or None for teachers, who
+        see everything"""
+        if user['role'] == '선생님':
+            return None
+        return {'전체'} | self.user_club_names(user['username'])
+    
+    def club_mask(self, filename, df, user, column='club'):
+        """Boolean mask of the rows of df (read from filename) the user may see"""
+        visible = self.visible_clubs(user)
+        if visible is None:
+            return pd.Series(True, index=df.index)
+        
+        series = df[column]
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            return series.isin(visible)
+        
+        # Look up each row's category code in a per-category allow list; the
+        # trailing False catches code -1 (missing club)
+        allowed = self.allowed_codes(filename, column, series.cat.categories, user['username'], visible)
+        return pd.Series(allowed[series.cat.codes.to_numpy()], index=df.index)
+    
+    def allowed_codes(self, filename, column, categories, username, visible):
+        key = (filename, column, username)
+        version = self.table_version(filename)
+        
+        entry = self.scope_cache.get(key)
+        if entry is not None and entry[0] == version and entry[1] == visible and (
+            entry[2] is categories or entry[2].equals(categories)
+        ):
+            return entry[3]
+        
+        allowed = np.append(categories.isin(visible), False)
+        self.scope_cache[key] = (version, visible, categories, allowed)
+        return allowed
+    
+    def filter_visible(self, filename, df, user, column='club'):
+        if df.empty or self.visible_clubs(user) is None:
+            return df
+        return df[self.club_mask(filename, df, user, column)]
+    
     def create_account(self, username, password, name, role):
         accounts_df = self.load_csv('accounts')
         
@@ -169,8 +1073,7 @@ class DataManager:
             'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        accounts_df = pd.concat([accounts_df, pd.DataFrame([new_account])], ignore_index=True)
-        return self.save_csv('accounts', accounts_df)
+        return self.append_row('accounts', new_account)
     
     def create_club(self, name, icon, description, president, max_members):
         clubs_df = self.load_csv('clubs')
@@ -187,42 +1090,44 @@ class DataManager:
             'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        clubs_df = pd.concat([clubs_df, pd.DataFrame([new_club])], ignore_index=True)
-        return self.save_csv('clubs', clubs_df)
+        return self.append_row('clubs', new_club)
     
     def delete_club(self, club_name):
-        clubs_df = self.load_csv('clubs')
-        clubs_df = clubs_df[clubs_df['name'] != club_name]
-        
-        # Also remove user associations
-        user_clubs_df = self.load_csv('user_clubs')
-        user_clubs_df = user_clubs_df[user_clubs_df['club_name'] != club_name]
-        
-        self.save_csv('clubs', clubs_df)
-        self.save_csv('user_clubs', user_clubs_df)
+        with self.table_lock('clubs'), self.table_lock('user_clubs'):
+            versions = self.membership_versions()
+            
+            clubs_df = self.load_csv('clubs')
+            clubs_df = clubs_df[clubs_df['name'] != club_name]
+            
+            # Also remove user associations
+            user_clubs_df = self.load_csv('user_clubs')
+            user_clubs_df = user_clubs_df[user_clubs_df['club_name'] != club_name]
+            
+            self.save_csv('clubs', clubs_df)
+            self.save_csv('user_clubs', user_clubs_df)
+            self.update_memberships(versions, lambda index: index.remove_club(club_name))
     
     def add_user_to_club(self, username, club_name):
-        user_clubs_df = self.load_csv('user_clubs')
-        
-        # Check if already member
-        existing = user_clubs_df[(user_clubs_df['username'] == username) & 
-                                (user_clubs_df['club_name'] == club_name)]
-        if not existing.empty:
-            return False
-        
-        new_membership = {
-            'username': username,
-            'club_name': club_name,
-            'joined_date': datetime.now().strftime('%Y-%m-%d')
-        }
-        
-        user_clubs_df = pd.concat([user_clubs_df, pd.DataFrame([new_membership])], ignore_index=True)
-        return self.save_csv('user_clubs', user_clubs_df)
+        with self.table_lock('user_clubs'):
+            versions = self.membership_versions()
+            
+            # Check if already member
+            if self.memberships().is_member(username, club_name):
+                return False
+            
+            new_membership = {
+                'username': username,
+                'club_name': club_name,
+                'joined_date': datetime.now().strftime('%Y-%m-%d')
+            }
+            
+            if not self.append_row('user_clubs', new_membership):
+                return False
+            self.update_memberships(versions, lambda index: index.add_member(username, club_name))
+            return True
     
     def add_post(self, author, title, content, club):
-        posts_df = self.load_csv('posts')
-        
-        new_id = len(posts_df) + 1
+        new_id = self.next_id('posts')
         new_post = {
             'id': new_id,
             'title': title,
@@ -233,29 +1138,28 @@ class DataManager:
             'likes': 0
         }
         
-        posts_df = pd.concat([posts_df, pd.DataFrame([new_post])], ignore_index=True)
-        return self.save_csv('posts', posts_df)
+        return self.append_row('posts', new_post)
     
     def add_chat_message(self, username, message, club):
-        chat_logs_df = self.load_csv('chat_logs')
+        # Messages must be appended in ID order: live feeds only look for IDs
+        # above the last one they saw
+        with self.table_lock('chat_logs'):
+            new_id = self.next_id('chat_logs')
+            new_message = {
+                'id': new_id,
+                'username': username,
+                'message': message,
+                'club': club,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'deleted': False
+            }
+            saved = self.append_row('chat_logs', new_message)
         
-        new_id = len(chat_logs_df) + 1
-        new_message = {
-            'id': new_id,
-            'username': username,
-            'message': message,
-            'club': club,
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'deleted': False
-        }
-        
-        chat_logs_df = pd.concat([chat_logs_df, pd.DataFrame([new_message])], ignore_index=True)
-        return self.save_csv('chat_logs', chat_logs_df)
+        # The saved message, so the caller can publish it to live sessions
+        return new_message if saved else False
     
     def add_assignment(self, title, description, club, due_date, creator):
-        assignments_df = self.load_csv('assignments')
-        
-        new_id = len(assignments_df) + 1
+        new_id = self.next_id('assignments')
         new_assignment = {
             'id': new_id,
             'title': title,
@@ -267,13 +1171,10 @@ class DataManager:
             'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        assignments_df = pd.concat([assignments_df, pd.DataFrame([new_assignment])], ignore_index=True)
-        return self.save_csv('assignments', assignments_df)
+        return self.append_row('assignments', new_assignment)
     
     def add_submission(self, assignment_id, username, content, file_path=None):
-        submissions_df = self.load_csv('submissions')
-        
-        new_id = len(submissions_df) + 1
+        new_id = self.next_id('submissions')
         new_submission = {
             'id': new_id,
             'assignment_id': assignment_id,
@@ -285,13 +1186,10 @@ class DataManager:
             'submitted_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        submissions_df = pd.concat([submissions_df, pd.DataFrame([new_submission])], ignore_index=True)
-        return self.save_csv('submissions', submissions_df)
+        return self.append_row('submissions', new_submission)
     
     def add_schedule(self, title, description, date, club, creator):
-        schedule_df = self.load_csv('schedule')
-        
-        new_id = len(schedule_df) + 1
+        new_id = self.next_id('schedule')
         new_event = {
             'id': new_id,
             'title': title,
@@ -302,13 +1200,10 @@ class DataManager:
             'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        schedule_df = pd.concat([schedule_df, pd.DataFrame([new_event])], ignore_index=True)
-        return self.save_csv('schedule', schedule_df)
+        return self.append_row('schedule', new_event)
     
     def add_points(self, username, points, reason):
-        points_df = self.load_csv('points')
-        
-        new_id = len(points_df) + 1
+        new_id = self.next_id('points')
         new_points = {
             'id': new_id,
             'username': username,
@@ -318,5 +1213,4 @@ class DataManager:
             'awarded_by': 'system'
         }
         
-        points_df = pd.concat([points_df, pd.DataFrame([new_points])], ignore_index=True)
-        return self.save_csv('points', points_df)
+        return self.append_row('points', new_points)
@@ -0,0 +1,98 @@
+import re
+
+# Jamo edits allowed between a query word and a word it fuzzily matches
+FUZZY_MAX_DISTANCE = 1
+# Shorter words (in jamo) only match exactly; one edit changes them too much
+FUZZY_MIN_LENGTH = 4
+
+# Hangul syllables are composed as 0xAC00 + (initial * 21 + medial) * 28 + final
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def words_of(text):
+    return WORD_PATTERN.findall(text)
+
+def to_jamo(word):
+    """word with each Hangul syllable spelled out as its jamo, so a typo in
+    one jamo is one edit rather than a whole different syllable"""
+    letters = []
+    for char in word:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            letters.append(CHOSEONG[code // 588])
+            letters.append(JUNGSEONG[code % 588 // 28])
+            letters.append(JONGSEONG[code % 28])
+        else:
+            letters.append(char)
+    return ''.join(letters)
+
+def deletes(spelling, distance):
+    # spelling with up to distance characters removed
+    variants = {spelling}
+    for _ in range(distance):
+        variants |= {variant[:i] + variant[i + 1:] for variant in variants for i in range(len(variant))}
+    return variants
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps count as one edit),
+    or limit + 1 once it is certain to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class FuzzyIndex:
+    """Symmetric-delete index over the jamo spelling of a vocabulary: words
+    within FUZZY_MAX_DISTANCE edits of a query word share a deletion variant
+    with it, so they are found without comparing against every word"""
+    
+    def __init__(self):
+        # deletion variant -> words (and word prefixes) having it
+        self.variants = {}
+        # Words and prefixes already indexed
+        self.indexed = set()
+    
+    def add(self, word):
+        """Index word and each of its prefixes; Korean words carry particles
+        (발표를), so a typo in the stem has to match the start of a word"""
+        for end in range(len(word), 0, -1):
+            prefix = word[:end]
+            # Its own prefixes were indexed along with it
+            if prefix in self.indexed:
+                break
+            spelling = to_jamo(prefix)
+            if len(spelling) < FUZZY_MIN_LENGTH:
+                break
+            self.indexed.add(prefix)
+            for variant in deletes(spelling, FUZZY_MAX_DISTANCE):
+                self.variants.setdefault(variant, set()).add(prefix)
+    
+    def similar(self, word):
+        """Indexed words and prefixes within FUZZY_MAX_DISTANCE jamo edits of word"""
+        spelling = to_jamo(word)
+        if len(spelling) < FUZZY_MIN_LENGTH:
+            return set()
+        
+        candidates = set()
+        for variant in deletes(spelling, FUZZY_MAX_DISTANCE):
+            candidates |= self.variants.get(variant, set())
+        return {
+            candidate for candidate in candidates
+            if edit_distance(spelling, to_jamo(candidate), FUZZY_MAX_DISTANCE) <= FUZZY_MAX_DISTANCE
+        }
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import base64
 from io import BytesIO
@@ -29,10 +28,7 @@ class GallerySystem:
             return
         
         # Filter by club if not teacher
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            galleries_df = galleries_df[galleries_df['club'].isin(user_club_names)]
+        galleries_df = st.session_state.data_manager.filter_visible('galleries', galleries_df, user)
         
         # Sort by creation date
         galleries_df = galleries_df.sort_values('created_date', ascending=False)
@@ -46,8 +42,9 @@ class GallerySystem:
     
     def show_artwork_card(self, artwork, user):
         # Get comments count
-        comments_df = st.session_state.data_manager.load_csv('gallery_comments')
-        comments_count = len(comments_df[comments_df['gallery_id'] == artwork['id']])
+        comments_count = len(st.session_state.data_manager.query(
+            'gallery_comments', where={'gallery_id': artwork['id']}, columns=['id']
+        ))
         
         st.markdown(f"""
         <div class="club-card">
@@ -134,8 +131,7 @@ class GallerySystem:
                     clubs_df = st.session_state.data_manager.load_csv('clubs')
                     club_options = ["전체"] + clubs_df['name'].tolist()
                 else:
-                    user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                    club_options = user_clubs['club_name'].tolist()
+                    club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
                 
                 selected_club = st.selectbox("동아리", club_options)
             
@@ -168,9 +164,7 @@ class GallerySystem:
     
     def upload_artwork(self, title, description, uploaded_file, author, club):
         try:
-            galleries_df = st.session_state.data_manager.load_csv('galleries')
-            
-            new_id = len(galleries_df) + 1
+            new_id = st.session_state.data_manager.next_id('galleries')
             image_path = ""
             
             if uploaded_file is not None:
@@ -188,8 +182,7 @@ class GallerySystem:
                 'likes': 0
             }
             
-            galleries_df = pd.concat([galleries_df, pd.DataFrame([new_artwork])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('galleries', galleries_df)
+            return st.session_state.data_manager.append_row('galleries', new_artwork)
         
         except Exception as e:
             print(f"Artwork upload error: {e}")
@@ -197,17 +190,16 @@ class GallerySystem:
     
     def add_like(self, gallery_id):
         try:
-            galleries_df = st.session_state.data_manager.load_csv('galleries')
-            galleries_df.loc[galleries_df['id'] == gallery_id, 'likes'] += 1
-            st.session_state.data_manager.save_csv('galleries', galleries_df)
+            # Incremented under the table lock, so concurrent likes all count
+            return st.session_state.data_manager.update_by_id(
+                'galleries', gallery_id, likes=lambda likes: likes + 1
+            )
         except Exception as e:
             print(f"Like add error: {e}")
     
     def add_comment(self, gallery_id, username, comment):
         try:
-            comments_df = st.session_state.data_manager.load_csv('gallery_comments')
-            
-            new_id = len(comments_df) + 1
+            new_id = st.session_state.data_manager.next_id('gallery_comments')
             new_comment = {
                 'id': new_id,
                 'gallery_id': gallery_id,
@@ -216,8 +208,7 @@ class GallerySystem:
                 'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            comments_df = pd.concat([comments_df, pd.DataFrame([new_comment])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('gallery_comments', comments_df)
+            return st.session_state.data_manager.append_row('gallery_comments', new_comment)
         
         except Exception as e:
             print(f"Comment add error: {e}")
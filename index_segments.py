@@ -0,0 +1,75 @@
+import numpy as np
+import os
+import json
+import time
+import shutil
+
+# Name of the file holding the current segment of a table's index directory
+CURRENT_FILE = 'CURRENT'
+
+EMPTY_POSTINGS = np.array([], dtype='int64')
+
+class IndexSegment:
+    """Immutable on-disk n-gram postings of one table, written by the search
+    index's merge thread. Every posting list is stored in one array that is
+    memory-mapped, so opening a segment only reads its term list."""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'terms.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        # n-gram -> position of its posting list
+        self.terms = {term: i for i, term in enumerate(meta['terms'])}
+        # Vocabulary of the indexed rows, for fuzzy search
+        self.words = meta['words']
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+        self.postings = np.load(os.path.join(path, 'postings.npy'), mmap_mode='r')
+        # Indexed row ids and the hashes of their texts when indexed
+        self.ids = np.load(os.path.join(path, 'ids.npy'))
+        self.hashes = np.load(os.path.join(path, 'hashes.npy'))
+    
+    def lookup(self, term):
+        """Sorted ids of the rows containing term"""
+        i = self.terms.get(term)
+        if i is None:
+            return EMPTY_POSTINGS
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+def open_segment(table_dir):
+    """The current segment under table_dir, or None if there is none or it
+    can't be read (the index is then rebuilt from the table)"""
+    try:
+        with open(os.path.join(table_dir, CURRENT_FILE), encoding='utf-8') as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    
+    try:
+        return IndexSegment(os.path.join(table_dir, name))
+    except Exception as e:
+        print(f"Search index segment error: {e}")
+        return None
+
+def write_segment(table_dir, terms, offsets, postings, ids, hashes, words):
+    """Write a new segment and make it current; segments are never modified,
+    so readers of the previous one are unaffected"""
+    name = f'segment-{time.time_ns()}-{os.getpid()}'
+    path = os.path.join(table_dir, name)
+    os.makedirs(path)
+    
+    with open(os.path.join(path, 'terms.json'), 'w', encoding='utf-8') as f:
+        json.dump({'terms': terms, 'words': words}, f, ensure_ascii=False)
+    np.save(os.path.join(path, 'offsets.npy'), np.asarray(offsets, dtype='int64'))
+    np.save(os.path.join(path, 'postings.npy'), np.asarray(postings, dtype='int64'))
+    np.save(os.path.join(path, 'ids.npy'), np.asarray(ids, dtype='int64'))
+    np.save(os.path.join(path, 'hashes.npy'), np.asarray(hashes, dtype='uint64'))
+    
+    current_path = os.path.join(table_dir, CURRENT_FILE)
+    with open(current_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(current_path + '.tmp', current_path)
+    return IndexSegment(path)
+
+def remove_segment(segment):
+    # Platforms that lock mapped files may leave the directory behind
+    shutil.rmtree(segment.path, ignore_errors=True)
@@ -0,0 +1,39 @@
+import threading
+
+class MembershipIndex:
+    """Bidirectional user <-> club membership, built from the user_clubs
+    table"""
+    
+    def __init__(self, user_clubs_df):
+        # username -> {club_name: None}, kept in join order
+        self.user_clubs = {}
+        # club_name -> {username: None}
+        self.club_members = {}
+        self.lock = threading.Lock()
+        
+        if not user_clubs_df.empty:
+            for username, club_name in zip(user_clubs_df['username'], user_clubs_df['club_name']):
+                self.user_clubs.setdefault(username, {})[club_name] = None
+                self.club_members.setdefault(club_name, {})[username] = None
+    
+    def clubs_of(self, username):
+        with self.lock:
+            return set(self.user_clubs.get(username, ()))
+    
+    def members_of(self, club_name):
+        with self.lock:
+            return set(self.club_members.get(club_name, ()))
+    
+    def is_member(self, username, club_name):
+        with self.lock:
+            return club_name in self.user_clubs.get(username, ())
+    
+    def add_member(self, username, club_name):
+        with self.lock:
+            self.user_clubs.setdefault(username, {})[club_name] = None
+            self.club_members.setdefault(club_name, {})[username] = None
+    
+    def remove_club(self, club_name):
+        with self.lock:
+            for username in self.club_members.pop(club_name, {}):
+                self.user_clubs.get(username, {}).pop(club_name, None)
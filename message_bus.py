@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+# redis is optional; without it the bus only reaches sessions in this process
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Undelivered messages kept per subscription; older ones are dropped
+SUBSCRIPTION_BUFFER = 500
+# Subscriptions not drained for this long (seconds) belong to closed sessions
+SUBSCRIPTION_TTL = 600
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def chat_topic(club):
+    return f'chat:{club}'
+
+def notification_topic(recipient):
+    # recipient is a username, a role, a club name or '전체'
+    return f'notify:{recipient}'
+
+class Subscription:
+    def __init__(self, bus, topics):
+        self.bus = bus
+        self.topics = set(topics)
+        self.messages = deque(maxlen=SUBSCRIPTION_BUFFER)
+        self.last_drained = time.monotonic()
+        # Set once the bus drops the subscription; subscribe again to resume
+        self.closed = False
+        self.lock = threading.Lock()
+    
+    def deliver(self, topic, message):
+        with self.lock:
+            self.messages.append((topic, message))
+    
+    def drain(self):
+        """(topic, message) pairs published since the last drain"""
+        with self.lock:
+            messages = list(self.messages)
+            self.messages.clear()
+            self.last_drained = time.monotonic()
+        return messages
+    
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class MessageBus:
+    """Process-wide publish/subscribe hub. Each Streamlit session subscribes
+    to the topics it shows and drains the messages pushed to it, instead of
+    re-reading the tables they were written to."""
+    
+    # Only reaches sessions of this server process
+    shared = False
+    
+    def __init__(self):
+        # topic -> set of Subscriptions
+        self.topics = {}
+        self.lock = threading.Lock()
+    
+    def subscribe(self, topics):
+        subscription = Subscription(self, topics)
+        with self.lock:
+            for topic in subscription.topics:
+                self.topics.setdefault(topic, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        subscription.closed = True
+        with self.lock:
+            for topic in subscription.topics:
+                subscribers = self.topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.topics[topic]
+    
+    def publish(self, topic, message):
+        """Deliver message to every subscription of topic; returns how many"""
+        with self.lock:
+            subscribers = list(self.topics.get(topic, ()))
+        
+        now = time.monotonic()
+        delivered = 0
+        for subscription in subscribers:
+            # Sessions don't say goodbye; drop the ones that stopped draining
+            if now - subscription.last_drained > SUBSCRIPTION_TTL:
+                self.unsubscribe(subscription)
+                continue
+            subscription.deliver(topic, message)
+            delivered += 1
+        return delivered
+
+class RedisMessageBus(MessageBus):
+    """MessageBus relayed through Redis (or any server speaking its pub/sub
+    protocol), so sessions of every server process receive each message"""
+    
+    shared = True
+    
+    def __init__(self, url):
+        super().__init__()
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        # Relay every topic; local subscriptions filter what they receive
+        self.pubsub.psubscribe('club:*')
+        self.thread = threading.Thread(target=self.relay, daemon=True)
+        self.thread.start()
+    
+    def publish(self, topic, message):
+        # Messages must be JSON-serialisable to cross process boundaries
+        self.client.publish(f'club:{topic}', json.dumps(message, ensure_ascii=False, default=str))
+        return 1
+    
+    def relay(self):
+        for item in self.pubsub.listen():
+            try:
+                topic = item['channel'].decode()[len('club:'):]
+                MessageBus.publish(self, topic, json.loads(item['data']))
+            except Exception as e:
+                print(f"Message bus relay error: {e}")
+
+def get_message_bus():
+    """The bus shared by all sessions of this process; set CLUB_MESSAGE_BUS_URL
+    (e.g. redis://localhost:6379/0) to relay it between processes"""
+    global _bus
+    
+    with _bus_lock:
+        if _bus is None:
+            url = os.environ.get('CLUB_MESSAGE_BUS_URL')
+            if url and redis is not None:
+                try:
+                    _bus = RedisMessageBus(url)
+                except Exception as e:
+                    print(f"Message bus connection error: {e}")
+            if _bus is None:
+                _bus = MessageBus()
+        return _bus
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
+from message_bus import get_message_bus, notification_topic
+
+# Seconds between checks for newly pushed notifications
+NOTIFICATION_POLL_SECONDS = 5
 
 class NotificationSystem:
     def __init__(self):
@@ -60,11 +64,11 @@ class NotificationSystem:
     
     def show_notification_card(self, notification, user):
         # Check if read
-        read_status_df = st.session_state.data_manager.load_csv('notification_reads')
-        is_read = not read_status_df[
-            (read_status_df['notification_id'] == notification['id']) &
-            (read_status_df['username'] == user['username'])
-        ].empty
+        is_read = not st.session_state.data_manager.query(
+            'notification_reads',
+            where={'notification_id': notification['id'], 'username': user['username']},
+            limit=1
+        ).empty
         
         # Notification styling
         if is_read:
@@ -166,9 +170,7 @@ class NotificationSystem:
     
     def send_notification(self, title, content, sender, recipient, category, priority):
         try:
-            notifications_df = st.session_state.data_manager.load_csv('notifications')
-            
-            new_id = len(notifications_df) + 1
+            new_id = st.session_state.data_manager.next_id('notifications')
             new_notification = {
                 'id': new_id,
                 'title': title,
@@ -180,8 +182,11 @@ class NotificationSystem:
                 'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            notifications_df = pd.concat([notifications_df, pd.DataFrame([new_notification])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('notifications', notifications_df)
+            if not st.session_state.data_manager.append_row('notifications', new_notification):
+                return False
+            
+            get_message_bus().publish(notification_topic(recipient), new_notification)
+            return True
         
         except Exception as e:
             print(f"Notification send error: {e}")
@@ -198,7 +203,7 @@ class NotificationSystem:
             ]
             
             if existing.empty:
-                new_id = len(reads_df) + 1
+                new_id = st.session_state.data_manager.next_id('notification_reads')
                 new_read = {
                     'id': new_id,
                     'notification_id': notification_id,
@@ -206,8 +211,7 @@ class NotificationSystem:
                     'read_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
                 
-                reads_df = pd.concat([reads_df, pd.DataFrame([new_read])], ignore_index=True)
-                return st.session_state.data_manager.save_csv('notification_reads', reads_df)
+                return st.session_state.data_manager.append_row('notification_reads', new_read)
             
             return True
         
@@ -226,6 +230,8 @@ class NotificationSystem:
                 (notifications_df['recipient'] == '전체')
             ]
             
+            new_reads = []
+            
             for _, notification in user_notifications.iterrows():
                 # Check if already read
                 existing = reads_df[
@@ -234,17 +240,21 @@ class NotificationSystem:
                 ]
                 
                 if existing.empty:
-                    new_id = len(reads_df) + 1
-                    new_read = {
-                        'id': new_id,
+                    new_reads.append({
                         'notification_id': notification['id'],
                         'username': username,
                         'read_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    
-                    reads_df = pd.concat([reads_df, pd.DataFrame([new_read])], ignore_index=True)
+                    })
+            
+            if not new_reads:
+                return True
+            
+            # Reserve one block of IDs for the whole batch
+            new_ids = st.session_state.data_manager.reserve_ids('notification_reads', len(new_reads))
+            for new_read, new_id in zip(new_reads, new_ids):
+                new_read['id'] = new_id
             
-            return st.session_state.data_manager.save_csv('notification_reads', reads_df)
+            return st.session_state.data_manager.append_rows('notification_reads', new_reads)
         
         except Exception as e:
             print(f"Mark all as read error: {e}")
@@ -414,6 +424,24 @@ class NotificationSystem:
             print(f"User notification settings save error: {e}")
             return False
     
+    @st.fragment(run_every=NOTIFICATION_POLL_SECONDS)
+    def show_live_notifications(self, user):
+        # Toasts notifications sent to this user while the session is open;
+        # reads the session's bus subscription, not the notifications table
+        clubs = st.session_state.data_manager.user_club_names(user['username'])
+        topics = {notification_topic(recipient) for recipient in {user['username'], user['role'], '전체'} | clubs}
+        
+        subscription = st.session_state.get('notification_subscription')
+        if subscription is None or subscription.closed or subscription.topics != topics:
+            if subscription is not None:
+                subscription.close()
+            subscription = get_message_bus().subscribe(topics)
+            st.session_state.notification_subscription = subscription
+        
+        for _, notification in subscription.drain():
+            if notification['sender'] != user['username']:
+                st.toast(f"🔔 {notification['title']}")
+    
     def get_unread_count(self, username):
         """Get count of unread notifications for a user"""
         try:
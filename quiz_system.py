@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
 import json
 import random
@@ -41,10 +40,7 @@ class QuizSystem:
             return
         
         # Filter quizzes based on user's clubs
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            quizzes_df = quizzes_df[quizzes_df['club'].isin(user_club_names)]
+        quizzes_df = st.session_state.data_manager.filter_visible('quizzes', quizzes_df, user)
         
         # Sort by creation date
         quizzes_df = quizzes_df.sort_values('created_date', ascending=False)
@@ -54,11 +50,10 @@ class QuizSystem:
     
     def show_quiz_card(self, quiz, user):
         # Check if user has attempted this quiz
-        quiz_attempts_df = st.session_state.data_manager.load_csv('quiz_attempts')
-        user_attempt = quiz_attempts_df[
-            (quiz_attempts_df['quiz_id'] == quiz['id']) &
-            (quiz_attempts_df['username'] == user['username'])
-        ]
+        user_attempt = st.session_state.data_manager.query(
+            'quiz_attempts',
+            where={'quiz_id': quiz['id'], 'username': user['username']}
+        )
         
         has_attempted = not user_attempt.empty
         best_score = user_attempt['score'].max() if has_attempted else 0
@@ -168,9 +163,7 @@ class QuizSystem:
         return score
     
     def save_quiz_attempt(self, quiz_id, username, answers, score):
-        quiz_attempts_df = st.session_state.data_manager.load_csv('quiz_attempts')
-        
-        new_id = len(quiz_attempts_df) + 1
+        new_id = st.session_state.data_manager.next_id('quiz_attempts')
         new_attempt = {
             'id': new_id,
             'quiz_id': quiz_id,
@@ -180,8 +173,7 @@ class QuizSystem:
             'attempted_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        quiz_attempts_df = pd.concat([quiz_attempts_df, pd.DataFrame([new_attempt])], ignore_index=True)
-        st.session_state.data_manager.save_csv('quiz_attempts', quiz_attempts_df)
+        st.session_state.data_manager.append_row('quiz_attempts', new_attempt)
     
     def show_quiz_creation(self, user):
         st.markdown("#### ➕ 퀴즈 생성")
@@ -198,8 +190,7 @@ class QuizSystem:
                     clubs_df = st.session_state.data_manager.load_csv('clubs')
                     club_options = ["전체"] + clubs_df['name'].tolist()
                 else:
-                    user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                    club_options = user_clubs['club_name'].tolist()
+                    club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
                 
                 selected_club = st.selectbox("대상 동아리", club_options)
             
@@ -274,9 +265,7 @@ class QuizSystem:
     
     def create_quiz(self, title, description, club, difficulty, time_limit, questions, creator):
         try:
-            quizzes_df = st.session_state.data_manager.load_csv('quizzes')
-            
-            new_id = len(quizzes_df) + 1
+            new_id = st.session_state.data_manager.next_id('quizzes')
             new_quiz = {
                 'id': new_id,
                 'title': title,
@@ -289,8 +278,7 @@ class QuizSystem:
                 'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            quizzes_df = pd.concat([quizzes_df, pd.DataFrame([new_quiz])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('quizzes', quizzes_df)
+            return st.session_state.data_manager.append_row('quizzes', new_quiz)
         
         except Exception as e:
             print(f"Quiz creation error: {e}")
@@ -308,8 +296,7 @@ class QuizSystem:
         
         # Filter quizzes by user's authority
         if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = user_clubs['club_name'].tolist()
+            user_club_names = st.session_state.data_manager.user_club_names(user['username'])
             quizzes_df = quizzes_df[
                 (quizzes_df['club'].isin(user_club_names)) |
                 (quizzes_df['creator'] == user['username'])
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
 import base64
 from io import BytesIO
@@ -37,8 +36,7 @@ class ReportGenerator:
                     clubs_df = st.session_state.data_manager.load_csv('clubs')
                     club_options = ["전체"] + clubs_df['name'].tolist()
                 else:
-                    user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                    club_options = user_clubs['club_name'].tolist()
+                    club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
                 
                 selected_club = st.selectbox("대상 동아리", club_options)
             
@@ -116,9 +114,7 @@ class ReportGenerator:
     
     def save_report(self, report_data):
         try:
-            reports_df = st.session_state.data_manager.load_csv('reports')
-            
-            new_id = len(reports_df) + 1
+            new_id = st.session_state.data_manager.next_id('reports')
             report_data['id'] = new_id
             
             # Convert dict to string for content storage
@@ -144,8 +140,7 @@ class ReportGenerator:
                 'created_date': report_data['created_date']
             }
             
-            reports_df = pd.concat([reports_df, pd.DataFrame([new_report])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('reports', reports_df)
+            return st.session_state.data_manager.append_row('reports', new_report)
         
         except Exception as e:
             print(f"Report save error: {e}")
@@ -162,8 +157,7 @@ class ReportGenerator:
         
         # Filter reports based on user role
         if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = user_clubs['club_name'].tolist()
+            user_club_names = st.session_state.data_manager.user_club_names(user['username'])
             reports_df = reports_df[
                 (reports_df['creator'] == user['username']) | 
                 (reports_df['club'].isin(user_club_names))
@@ -181,7 +175,7 @@ class ReportGenerator:
                     <div class="club-card">
                         <h4>📄 {report['title']}</h4>
                         <p><strong>동아리:</strong> {report['club']}</p>
-                        <p><strong>활동일:</strong> {report['report_date']}</p>
+                        <p><strong>활동일:</strong> {report['report_date'].strftime('%Y-%m-%d')}</p>
                         <p><strong>작성자:</strong> {report['creator']}</p>
                         <p><strong>작성일:</strong> {report['created_date']}</p>
                     </div>
@@ -204,7 +198,7 @@ class ReportGenerator:
     
     def show_report_preview(self, report):
         st.markdown(f"### 📄 {report['title']}")
-        st.markdown(f"**활동일:** {report['report_date']} | **동아리:** {report['club']} | **작성자:** {report['creator']}")
+        st.markdown(f"**활동일:** {report['report_date'].strftime('%Y-%m-%d')} | **동아리:** {report['club']} | **작성자:** {report['creator']}")
         
         try:
             # Parse content from string
@@ -321,7 +315,7 @@ class ReportGenerator:
 폴라리스반 동아리 활동 보고서
 
 제목: {report['title']}
-활동일: {report['report_date']}
+활동일: {report['report_date'].strftime('%Y-%m-%d')}
 동아리: {report['club']}
 작성자: {report['creator']}
 참가자 수: {content.get('participants_count', 'N/A')}명
@@ -378,6 +372,7 @@ class ReportGenerator:
         
         # Reports by club
         club_report_counts = reports_df['club'].value_counts()
+        club_report_counts = club_report_counts[club_report_counts > 0]
         st.markdown("##### 동아리별 보고서 수")
         st.bar_chart(club_report_counts)
         
@@ -388,7 +383,7 @@ class ReportGenerator:
         
         # Monthly report trend
         if not reports_df.empty:
-            reports_df['report_month'] = pd.to_datetime(reports_df['report_date']).dt.to_period('M')
+            reports_df['report_month'] = reports_df['report_date'].dt.to_period('M')
             monthly_counts = reports_df['report_month'].value_counts().sort_index()
             
             st.markdown("##### 월별 보고서 작성 추이")
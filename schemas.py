@@ -0,0 +1,94 @@
+import pandas as pd
+
+# Known values of categorical columns; values seen in the data are kept too
+ROLES = ['동아리원', '회장', '부회장', '총무', '기록부장', '디자인담당', '선생님']
+ATTENDANCE_STATUSES = ['출석', '지각', '결석', '병결']
+
+# Column dtypes of every table: 'int' (missing values read as 0), 'bool',
+# 'str', 'datetime' (parsed once at load) and 'category' or a list of the
+# category's known values
+TABLE_SCHEMAS = {
+    'accounts': {'username': 'str', 'password': 'str', 'name': 'str', 'role': ROLES, 'created_date': 'str'},
+    'clubs': {'name': 'str', 'icon': 'str', 'description': 'str', 'president': 'str', 'max_members': 'int', 'created_date': 'str'},
+    'user_clubs': {'username': 'str', 'club_name': 'str', 'joined_date': 'str'},
+    'posts': {'id': 'int', 'title': 'str', 'content': 'str', 'author': 'str', 'club': 'category', 'timestamp': 'str', 'likes': 'int'},
+    'chat_logs': {'id': 'int', 'username': 'str', 'message': 'str', 'club': 'category', 'timestamp': 'datetime', 'deleted': 'bool'},
+    'assignments': {'id': 'int', 'title': 'str', 'description': 'str', 'club': 'category', 'due_date': 'datetime', 'creator': 'str', 'status': 'category', 'created_date': 'str'},
+    'submissions': {'id': 'int', 'assignment_id': 'int', 'username': 'str', 'content': 'str', 'file_path': 'str', 'score': 'int', 'feedback': 'str', 'submitted_date': 'str'},
+    'attendance': {'id': 'int', 'username': 'str', 'club': 'category', 'date': 'datetime', 'status': ATTENDANCE_STATUSES, 'recorder': 'str'},
+    'schedule': {'id': 'int', 'title': 'str', 'description': 'str', 'date': 'datetime', 'club': 'category', 'creator': 'str', 'created_date': 'str'},
+    'badges': {'id': 'int', 'username': 'str', 'badge_name': 'str', 'description': 'str', 'awarded_date': 'str', 'awarded_by': 'str'},
+    'points': {'id': 'int', 'username': 'str', 'points': 'int', 'reason': 'str', 'date': 'str', 'awarded_by': 'str'},
+    'votes': {'id': 'int', 'title': 'str', 'description': 'str', 'options': 'str', 'creator': 'str', 'club': 'category', 'end_date': 'datetime', 'created_date': 'str'},
+    'vote_responses': {'id': 'int', 'vote_id': 'int', 'username': 'str', 'selected_option': 'str', 'voted_date': 'str'},
+    'quizzes': {'id': 'int', 'title': 'str', 'description': 'str', 'club': 'category', 'difficulty': 'category', 'time_limit': 'int', 'questions': 'str', 'creator': 'str', 'created_date': 'str'},
+    'quiz_attempts': {'id': 'int', 'quiz_id': 'int', 'username': 'str', 'answers': 'str', 'score': 'int', 'attempted_date': 'str'},
+    'galleries': {'id': 'int', 'title': 'str', 'description': 'str', 'image_path': 'str', 'author': 'str', 'club': 'category', 'created_date': 'str', 'likes': 'int'},
+    'gallery_comments': {'id': 'int', 'gallery_id': 'int', 'username': 'str', 'comment': 'str', 'created_date': 'str'},
+    'notifications': {'id': 'int', 'title': 'str', 'content': 'str', 'sender': 'str', 'recipient': 'str', 'category': 'category', 'priority': 'category', 'created_date': 'str'},
+    'notification_reads': {'id': 'int', 'notification_id': 'int', 'username': 'str', 'read_date': 'str'},
+    'notification_settings': {'deadline_reminder': 'bool', 'schedule_reminder': 'bool', 'new_member_notification': 'bool', 'chat_mention': 'bool', 'updated_date': 'str'},
+    'user_notification_settings': {'username': 'str', 'frequency': 'str', 'quiet_hours_enabled': 'bool', 'quiet_start': 'str', 'quiet_end': 'str', 'updated_date': 'str'},
+    'reports': {'id': 'int', 'title': 'str', 'content': 'str', 'creator': 'str', 'club': 'category', 'report_date': 'datetime', 'created_date': 'str'}
+}
+
+# Column layout of every table; also used to create the SQLite schema
+TABLE_COLUMNS = {table: list(schema) for table, schema in TABLE_SCHEMAS.items()}
+
+# Values read from CSV that count as True in 'bool' columns
+TRUE_VALUES = ['true', '1', '1.0', 'yes']
+
+def csv_dtypes(table, columns=None):
+    """read_csv dtypes that keep 'str' columns (passwords, usernames) from
+    being parsed as numbers"""
+    schema = TABLE_SCHEMAS.get(table, {})
+    return {col: str for col, kind in schema.items() if kind == 'str' and (not columns or col in columns)}
+
+def apply_schema(table, df):
+    """Convert the known columns of df to the table's registry dtypes"""
+    schema = TABLE_SCHEMAS.get(table)
+    if not schema or df is None:
+        return df
+    
+    for col, kind in schema.items():
+        if col in df.columns:
+            df[col] = convert_column(df[col], kind)
+    return df
+
+def convert_column(series, kind):
+    if kind == 'int':
+        if pd.api.types.is_integer_dtype(series):
+            return series.astype('int64')
+        return pd.to_numeric(series, errors='coerce').fillna(0).astype('int64')
+    
+    if kind == 'bool':
+        if pd.api.types.is_bool_dtype(series):
+            return series
+        return series.astype(str).str.strip().str.lower().isin(TRUE_VALUES)
+    
+    if kind == 'datetime':
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series, errors='coerce', format='ISO8601')
+    
+    if kind == 'str':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            # SQLite and untyped CSV reads hand back numbers for digit-only text
+            return series.map(lambda v: v if pd.isna(v) else format_number(v)).astype(object)
+        return series
+    
+    # 'category' or a list of known categories
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    if isinstance(kind, list):
+        missing = [value for value in kind if value not in series.cat.categories]
+        if missing:
+            series = series.cat.add_categories(missing)
+    return series
+
+def format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,616 @@
+import pandas as pd
+import numpy as np
+import os
+import math
+import heapq
+import queue
+import threading
+from collections import OrderedDict
+from schemas import convert_column
+from fuzzy_index import FuzzyIndex, words_of
+from index_segments import open_segment, write_segment, remove_segment
+
+# Searchable tables: text fields (the first is the title), author and date
+# columns. The date column is parsed once when rows are indexed.
+SEARCH_SOURCES = {
+    'posts': {'fields': ('title', 'content'), 'author': 'author', 'date': 'timestamp'},
+    'chat_logs': {'fields': ('message',), 'author': 'username', 'date': 'timestamp'},
+    'assignments': {'fields': ('title', 'description'), 'author': 'creator', 'date': 'created_date'},
+    'schedule': {'fields': ('title', 'description'), 'author': 'creator', 'date': 'date'},
+    'galleries': {'fields': ('title', 'description'), 'author': 'author', 'date': 'created_date'}
+}
+
+# Words are indexed by every character n-gram up to this length; Hangul has
+# no spaces inside compounds, so n-grams find matches a word index would miss
+MAX_GRAM = 3
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Term frequency weight of each field; fields not listed count once
+FIELD_BOOSTS = {'title': 2.0}
+# Extra weight for matching the whole query as typed, spaces included
+PHRASE_BOOST = 1.5
+# Scores are multiplied by 1 + RECENCY_WEIGHT, halving every half-life
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Term frequency weight of a fuzzy match relative to the typed word
+FUZZY_WEIGHT = 0.5
+
+# Result sets kept by the search cache (least recently used ones go first)
+SEARCH_CACHE_SIZE = 256
+
+# Rows added, edited or removed since a table's segment was written before
+# the merge thread writes a new one
+MERGE_MIN_ROWS = 256
+
+# (data_dir, backend) -> SearchIndex, shared by every session
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# (SearchIndex, table, 'sync' or 'merge') jobs for the maintenance thread
+_maintenance_queue = queue.Queue()
+_pending_jobs = set()
+_maintenance_lock = threading.Lock()
+_maintenance_thread = None
+
+def normalize(text):
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ''
+    return str(text).lower()
+
+def normalize_query(query):
+    # Case and runs of whitespace don't change what a query matches
+    return ' '.join(normalize(query).split())
+
+def text_grams(text):
+    grams = set()
+    for word in text.split():
+        for n in range(1, min(MAX_GRAM, len(word)) + 1):
+            grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+def query_grams(query):
+    # The longest n-grams of each query word are the most selective ones
+    grams = set()
+    for word in query.split():
+        n = min(MAX_GRAM, len(word))
+        grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+class TableIndex:
+    """Inverted n-gram index over the text fields of one table. Postings live
+    in an immutable on-disk segment plus an in-memory delta of the rows
+    indexed since it was written; the merge thread folds the delta into a
+    new segment (see SearchIndex.merge)."""
+    
+    def __init__(self, table, index_dir):
+        self.table = table
+        self.source = SEARCH_SOURCES[table]
+        self.segment_dir = os.path.join(index_dir, table)
+        self.segment = open_segment(self.segment_dir)
+        self.segment_ids = set() if self.segment is None else set(self.segment.ids.tolist())
+        # Segment rows since edited or removed; their postings are stale
+        self.removed = set()
+        # n-gram -> set of row ids, for the rows of the delta
+        self.postings = {}
+        self.delta = set()
+        # Delta rows being written into a new segment, and the rows removed
+        # while it is written (None when no merge is running)
+        self.merging = set()
+        self.merge_removed = None
+        # row id -> normalized field texts
+        self.texts = {}
+        # row id -> number of words, for BM25 length normalisation
+        self.lengths = {}
+        self.total_length = 0
+        self.boosts = [FIELD_BOOSTS.get(field, 1.0) for field in self.source['fields']]
+        # Vocabulary, and the same words by jamo spelling for fuzzy search
+        self.words = set()
+        self.fuzzy = FuzzyIndex()
+        # row id -> hash of the raw field texts, to spot edited rows; rows
+        # the segment has hashes for are only re-indexed if they changed
+        self.hashes = pd.Series(dtype='uint64')
+        if self.segment is not None:
+            self.hashes = pd.Series(self.segment.hashes, index=self.segment.ids)
+            self.add_words(self.segment.words)
+        # Indexed rows (by id) with the columns predicates and results use
+        self.rows = pd.DataFrame()
+        self.version = None
+        # Bumped on every sync, so cached results of older syncs are ignored
+        self.generation = 0
+    
+    def prepare(self, df):
+        """The part of a sync that reads the whole table: hashing its texts,
+        finding the rows that were added, edited or removed, and building
+        the metadata frame. It leaves the index alone, so it runs without
+        the index lock (syncs themselves never overlap; see SearchIndex.sync)."""
+        fields = list(self.source['fields'])
+        if df.empty:
+            df = pd.DataFrame(columns=['id', 'club', self.source['author'], self.source['date']] + fields)
+        df = df.drop_duplicates('id', keep='last')
+        
+        hashes = pd.Series(pd.util.hash_pandas_object(df[fields], index=False).values, index=df['id'].values)
+        
+        known = hashes.index.isin(self.hashes.index)
+        changed = hashes.index[~known]
+        if known.any():
+            common = hashes.index[known]
+            changed = changed.append(common[hashes[common].values != self.hashes[common].values])
+        removed = self.hashes.index[~self.hashes.index.isin(hashes.index)]
+        
+        # Metadata is cheap to rebuild and may change without the text (e.g.
+        # a chat message being deleted)
+        rows = pd.DataFrame({
+            'club': df['club'].astype(str),
+            'author': df[self.source['author']],
+            'date': convert_column(df[self.source['date']], 'datetime'),
+            # The date as stored, for display
+            'date_value': df[self.source['date']],
+            'deleted': df['deleted'] if 'deleted' in df.columns else False
+        })
+        for field in fields:
+            rows[field] = df[field]
+        rows.index = pd.Index(df['id'].values)
+        return df, hashes, rows, changed, removed
+    
+    def sync(self, df, hashes, rows, changed, removed):
+        """Apply a prepared table to the index, re-indexing only the rows that
+        were added or whose text changed"""
+        fields = list(self.source['fields'])
+        for row_id in removed.append(changed[changed.isin(self.hashes.index)]):
+            self.remove(row_id)
+        
+        if len(changed):
+            added = df[df['id'].isin(changed)]
+            for row_id, *values in zip(added['id'], *(added[field] for field in fields)):
+                self.add(row_id, tuple(normalize(value) for value in values))
+        
+        # Rows read from the segment only need their texts, not their n-grams
+        if len(self.texts) < len(hashes):
+            loaded = df[~df['id'].isin(list(self.texts))]
+            for row_id, *values in zip(loaded['id'], *(loaded[field] for field in fields)):
+                self.load(row_id, tuple(normalize(value) for value in values))
+        
+        self.hashes = hashes
+        self.rows = rows
+        self.generation += 1
+    
+    def load(self, row_id, texts):
+        self.texts[row_id] = texts
+        self.lengths[row_id] = sum(len(text.split()) for text in texts)
+        self.total_length += self.lengths[row_id]
+    
+    def add(self, row_id, texts):
+        self.load(row_id, texts)
+        self.delta.add(row_id)
+        for gram in text_grams(' '.join(texts)):
+            self.postings.setdefault(gram, set()).add(row_id)
+        self.add_words(words_of(' '.join(texts)))
+    
+    def add_words(self, words):
+        # The vocabulary only grows; words of removed rows match nothing
+        for word in words:
+            if word not in self.words:
+                self.words.add(word)
+                self.fuzzy.add(word)
+    
+    def remove(self, row_id):
+        # Postings of rows in the segment (or the one being written) can't be
+        # changed, so the rows are masked instead
+        if row_id in self.segment_ids or row_id in self.merging:
+            self.removed.add(row_id)
+            self.merging.discard(row_id)
+            if self.merge_removed is not None:
+                self.merge_removed.add(row_id)
+        
+        texts = self.texts.pop(row_id, None)
+        if texts is None:
+            return
+        self.total_length -= self.lengths.pop(row_id)
+        if row_id in self.delta:
+            self.unpost(row_id, texts)
+    
+    def unpost(self, row_id, texts):
+        # Drop a row from the delta
+        self.delta.discard(row_id)
+        for gram in text_grams(' '.join(texts)):
+            postings = self.postings.get(gram)
+            if postings is not None:
+                postings.discard(row_id)
+                if not postings:
+                    del self.postings[gram]
+    
+    def candidates(self, word):
+        """Rows with every n-gram of word; a superset of the rows containing it"""
+        grams = query_grams(word)
+        if not grams:
+            return set()
+        
+        # Intersect starting from the rarest n-gram
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result &= ids
+        
+        if self.segment is not None:
+            arrays = sorted((self.segment.lookup(gram) for gram in grams), key=len)
+            found = arrays[0]
+            for ids in arrays[1:]:
+                if not len(found):
+                    break
+                found = np.intersect1d(found, ids, assume_unique=True)
+            result |= set(found.tolist()) - self.removed
+        return result
+    
+    def needs_merge(self):
+        if self.merge_removed is not None or not self.texts:
+            return False
+        return self.segment is None or len(self.delta) + len(self.removed) >= MERGE_MIN_ROWS
+    
+    def begin_merge(self):
+        """What the merge thread needs to write a new segment; the index
+        keeps serving (and syncing) from the current one meanwhile"""
+        self.merging = set(self.delta)
+        self.merge_removed = set()
+        ids = sorted(self.merging | (self.segment_ids - self.removed))
+        return (
+            self.segment,
+            np.array(sorted(self.removed), dtype='int64'),
+            {row_id: self.texts[row_id] for row_id in self.merging},
+            ids,
+            self.hashes[ids].values,
+            [self.texts[row_id] for row_id in ids]
+        )
+    
+    def write_merge(self, segment, removed, delta, ids, hashes, texts):
+        # Runs on the merge thread, without the index lock
+        postings = {}
+        for row_id, row_texts in delta.items():
+            for gram in text_grams(' '.join(row_texts)):
+                postings.setdefault(gram, []).append(row_id)
+        lists = {gram: np.unique(np.array(row_ids, dtype='int64')) for gram, row_ids in postings.items()}
+        
+        if segment is not None:
+            # Posting lists of the segment without the removed rows
+            keep = ~np.isin(segment.postings, removed)
+            kept = segment.postings[keep]
+            offsets = np.concatenate(([0], np.cumsum(keep)))[segment.offsets]
+            for gram, i in segment.terms.items():
+                if offsets[i] < offsets[i + 1]:
+                    row_ids = kept[offsets[i]:offsets[i + 1]]
+                    lists[gram] = np.union1d(lists[gram], row_ids) if gram in lists else row_ids
+        
+        terms = sorted(lists)
+        offsets = np.concatenate(([0], np.cumsum([len(lists[gram]) for gram in terms])))
+        words = sorted({word for row_texts in texts for word in words_of(' '.join(row_texts))})
+        
+        os.makedirs(self.segment_dir, exist_ok=True)
+        return write_segment(
+            self.segment_dir, terms, offsets,
+            np.concatenate([lists[gram] for gram in terms]) if terms else [], ids, hashes, words
+        )
+    
+    def finish_merge(self, segment):
+        previous = self.segment
+        self.segment = segment
+        self.segment_ids = set(segment.ids.tolist())
+        # Only removals made while the segment was written are still pending
+        self.removed = self.merge_removed & self.segment_ids
+        for row_id in self.merging:
+            self.unpost(row_id, self.texts[row_id])
+        self.merging = set()
+        self.merge_removed = None
+        if previous is not None:
+            remove_segment(previous)
+    
+    def abort_merge(self):
+        self.merging = set()
+        self.merge_removed = None
+    
+    def expand(self, word):
+        """Indexed words and word prefixes within a jamo edit of word, other
+        than those that already contain it"""
+        return sorted(similar for similar in self.fuzzy.similar(word) if word not in similar)
+    
+    def match(self, query, within=None, fuzzy=False):
+        """The candidate rows of query and what score needs to rank them, or
+        None if there are none. within optionally restricts the search to a
+        set of row ids; with fuzzy, a word also matches indexed words one
+        jamo edit away. Reads the index, so the caller holds its lock."""
+        query = normalize_query(query)
+        words = list(dict.fromkeys(query.split()))
+        if not words or not self.texts:
+            return None
+        
+        # Each query word matches itself or, in fuzzy mode, its near
+        # spellings, which weigh less. Document frequencies come from the
+        # n-gram postings, which are exact for words up to MAX_GRAM
+        # characters and an upper bound beyond that.
+        doc_count = len(self.texts)
+        terms = []
+        candidates = within
+        for word in sorted(words, key=len, reverse=True):
+            spellings = [(word, 1.0)]
+            rows_with_word = self.candidates(word)
+            if fuzzy:
+                for similar in self.expand(word):
+                    spellings.append((similar, FUZZY_WEIGHT))
+                    rows_with_word = rows_with_word | self.candidates(similar)
+            
+            terms.append((spellings, math.log(1 + (doc_count - len(rows_with_word) + 0.5) / (len(rows_with_word) + 0.5))))
+            candidates = rows_with_word if candidates is None else candidates & rows_with_word
+            if not candidates:
+                return None
+        
+        candidates = sorted(candidates)
+        return {
+            'query': query,
+            'terms': terms,
+            'rows': self.rows.loc[candidates],
+            'texts': {row_id: self.texts[row_id] for row_id in candidates},
+            'lengths': {row_id: self.lengths[row_id] for row_id in candidates},
+            'average_length': self.total_length / doc_count or 1
+        }
+    
+    def score(self, matched, clubs=None, authors=None, start=None, end=None, include_deleted=True):
+        """Rows of a match containing every word of its query, best first,
+        with a BM25 score column; clubs/authors (sets), start/end (dates) and
+        include_deleted are applied before their text is checked. Uses only
+        what match copied out, so it runs without the index lock."""
+        if matched is None:
+            return self.rows.iloc[:0].assign(score=0.0)
+        query, terms, rows = matched['query'], matched['terms'], matched['rows']
+        
+        mask = pd.Series(True, index=rows.index)
+        if clubs is not None:
+            mask &= rows['club'].isin(list(clubs))
+        if authors is not None:
+            mask &= rows['author'].isin(list(authors))
+        # Rows without a parseable date are kept by date ranges
+        if start is not None:
+            mask &= (rows['date'] >= pd.Timestamp(start)) | rows['date'].isna()
+        if end is not None:
+            # end is inclusive of the whole day
+            mask &= (rows['date'] < pd.Timestamp(end) + pd.Timedelta(days=1)) | rows['date'].isna()
+        if not include_deleted:
+            mask &= ~rows['deleted'].astype(bool)
+        rows = rows[mask]
+        
+        # n-grams only narrow the candidates; count the actual occurrences
+        scores = {}
+        for row_id in rows.index:
+            texts = matched['texts'][row_id]
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * matched['lengths'][row_id] / matched['average_length'])
+            score = 0.0
+            for spellings, idf in terms:
+                tf = sum(
+                    text.count(spelling) * boost * weight
+                    for spelling, weight in spellings
+                    for text, boost in zip(texts, self.boosts)
+                )
+                if not tf:
+                    score = 0.0
+                    break
+                score += idf * tf * (BM25_K1 + 1) / (tf + length_norm)
+            if score:
+                if len(terms) > 1 and any(query in text for text in texts):
+                    score *= PHRASE_BOOST
+                scores[row_id] = score
+        
+        rows = rows.loc[list(scores)]
+        
+        # Newer rows rank higher; rows without a date get no boost. Ages count
+        # from midnight so scores, and so cursors, stay stable between pages
+        age = (pd.Timestamp.now().normalize() - rows['date']).dt.total_seconds() / 86400
+        decay = np.exp2(-age.clip(lower=0) / RECENCY_HALF_LIFE_DAYS).fillna(0)
+        rows = rows.assign(score=np.array(list(scores.values())) * (1 + RECENCY_WEIGHT * decay.values))
+        return rows.sort_values('score', ascending=False)
+
+class SearchIndex:
+    """Full-text index over every table in SEARCH_SOURCES, kept in sync with
+    the tables by comparing their versions on each search. Segments saved
+    under index_dir are opened at startup, so only rows changed since they
+    were written are indexed again."""
+    
+    def __init__(self, index_dir):
+        self.tables = {table: TableIndex(table, index_dir) for table in SEARCH_SOURCES}
+        # (table, query, filters) -> (index generation, scored rows)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        # Serializes syncs, which run partly outside self.lock
+        self.sync_lock = threading.Lock()
+    
+    def table_version(self, data_manager, table):
+        """The table's version, or None while it has queued writes, which
+        aren't reflected in the version yet"""
+        if data_manager.write_queue is not None and data_manager.write_queue.has_pending(table):
+            return None
+        version = data_manager.table_version(table)
+        if table == 'chat_logs':
+            # Archived messages are searched too
+            version = (version, data_manager.chat_archive.version())
+        return version
+    
+    def refresh(self, data_manager, table):
+        """The table's index, with a sync scheduled on the maintenance thread
+        if the table changed; searches meanwhile see the previous sync.
+        Only the first sync, before which there is nothing to search, runs
+        on the caller's thread."""
+        index = self.tables[table]
+        version = self.table_version(data_manager, table)
+        if version is not None and version == index.version:
+            return index
+        
+        if index.generation == 0:
+            self.sync(data_manager, table)
+        else:
+            self.schedule('sync', table, data_manager)
+        return index
+    
+    def sync(self, data_manager, table):
+        index = self.tables[table]
+        with self.sync_lock:
+            version = self.table_version(data_manager, table)
+            if version is not None and version == index.version:
+                return
+            
+            # Not the session's request snapshot: this usually runs on the
+            # maintenance thread, and the snapshot may predate the change
+            if table == 'chat_logs':
+                df = data_manager.load_chat_history(fresh=True)
+            else:
+                df = data_manager.load_fresh(table)
+            prepared = index.prepare(df)
+            with self.lock:
+                index.sync(*prepared)
+                index.version = version
+                if index.needs_merge():
+                    self.schedule('merge', table)
+    
+    def schedule(self, job, table, data_manager=None):
+        global _maintenance_thread
+        
+        with _maintenance_lock:
+            if (self, table, job) in _pending_jobs:
+                return
+            _pending_jobs.add((self, table, job))
+            
+            if _maintenance_thread is None or not _maintenance_thread.is_alive():
+                _maintenance_thread = threading.Thread(target=run_maintenance, daemon=True)
+                _maintenance_thread.start()
+        
+        _maintenance_queue.put((self, table, job, data_manager))
+    
+    def merge(self, table):
+        """Write the table's delta and its current segment into a new segment"""
+        index = self.tables[table]
+        with self.lock:
+            if not index.needs_merge():
+                return
+            state = index.begin_merge()
+        
+        try:
+            segment = index.write_merge(*state)
+        except Exception:
+            with self.lock:
+                index.abort_merge()
+            raise
+        
+        with self.lock:
+            index.finish_merge(segment)
+    
+    def search(self, data_manager, table, query, **filters):
+        """Scored matches of query in table; repeated and extended queries are
+        answered from the result cache"""
+        index = self.refresh(data_manager, table)
+        query = normalize_query(query)
+        filter_key = self.filter_key(filters)
+        
+        predicates = {name: value for name, value in filters.items() if name != 'fuzzy'}
+        fuzzy = filters.get('fuzzy', False)
+        
+        # Only the cache and the candidate lookup hold the lock; scoring, the
+        # expensive part, runs alongside other sessions' searches
+        with self.lock:
+            generation = index.generation
+            entry = self.cache.get((table, query, filter_key))
+            if entry is not None and entry[0] == generation:
+                self.cache.move_to_end((table, query, filter_key))
+                return entry[1]
+            
+            # Fuzzy matches of a query needn't match its prefixes
+            within = None if fuzzy else self.prefix_matches(table, query, filter_key, generation)
+            matched = index.match(query, within=within, fuzzy=fuzzy)
+        
+        rows = index.score(matched, **predicates)
+        
+        with self.lock:
+            self.cache[(table, query, filter_key)] = (generation, rows)
+            while len(self.cache) > SEARCH_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return rows
+    
+    def prefix_matches(self, table, query, filter_key, generation):
+        # Every match of a query is also a match of each of its prefixes, so
+        # while typing only the previous, shorter query's matches need checking
+        for end in range(len(query) - 1, 0, -1):
+            entry = self.cache.get((table, query[:end].rstrip(), filter_key))
+            if entry is not None and entry[0] == generation:
+                return set(entry[1].index)
+        return None
+    
+    def filter_key(self, filters):
+        # Hashable form of the search predicates (sets become sorted tuples)
+        return tuple(
+            (name, tuple(sorted(map(str, value))) if isinstance(value, (set, frozenset, list, tuple)) else str(value))
+            for name, value in sorted(filters.items())
+        )
+    
+    def top_hits(self, data_manager, tables, query, limit, after=None, **filters):
+        """The limit best hits across tables as (table, row, match offsets,
+        matched terms), the cursor for the hits after them (None when there
+        are no more) and the total number of matches; after is a cursor
+        returned by a previous call"""
+        results = {table: self.search(data_manager, table, query, **filters) for table in tables}
+        
+        # Hits are ordered by (score, table, id) descending; the cursor is the
+        # key of the last hit returned
+        keys = (
+            (score, table, row_id)
+            for table, rows in results.items()
+            for score, row_id in zip(rows['score'], rows.index)
+        )
+        if after is not None:
+            keys = (key for key in keys if key < after)
+        best = heapq.nlargest(limit + 1, keys)
+        
+        cursor = best[limit - 1] if len(best) > limit else None
+        terms = {table: self.terms(table, query, filters.get('fuzzy', False)) for table in tables}
+        hits = [
+            (table, results[table].loc[row_id], self.match_offsets(table, row_id, terms[table]), terms[table])
+            for _, table, row_id in best[:limit]
+        ]
+        return hits, cursor, sum(len(rows) for rows in results.values())
+    
+    def terms(self, table, query, fuzzy=False):
+        """The words a query looks for in table: its own words plus, in fuzzy
+        mode, the near spellings they matched"""
+        words = normalize_query(query).split()
+        if not fuzzy:
+            return words
+        with self.lock:
+            return words + [similar for word in words for similar in self.tables[table].expand(word)]
+    
+    def match_offsets(self, table, row_id, terms):
+        """Offset of the first of terms in each text field of a row, -1 in
+        fields without one; found in the index's normalized copy of the text"""
+        with self.lock:
+            texts = self.tables[table].texts.get(row_id, ())
+        return [min((text.find(term) for term in terms if term in text), default=-1) for text in texts]
+
+def get_search_index(data_manager):
+    key = (os.path.abspath(data_manager.data_dir), data_manager.backend)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SearchIndex(os.path.join(data_manager.data_dir, 'search_index', data_manager.backend))
+        return _indexes[key]
+
+def run_maintenance():
+    # Background worker; keeps syncs and segment writes off the Streamlit
+    # script thread
+    while True:
+        search_index, table, job, data_manager = _maintenance_queue.get()
+        # Changes made while the job runs schedule it again
+        with _maintenance_lock:
+            _pending_jobs.discard((search_index, table, job))
+        try:
+            if job == 'sync':
+                search_index.sync(data_manager, table)
+            else:
+                search_index.merge(table)
+        except Exception as e:
+            print(f"Search index {job} error: {e}")
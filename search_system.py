@@ -1,7 +1,31 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
 import re
+import html
+from functools import lru_cache
+from search_index import get_search_index
+
+# Search scope choices and the table each one covers
+SEARCH_TABLES = {
+    "게시판": 'posts',
+    "채팅": 'chat_logs',
+    "과제": 'assignments',
+    "일정": 'schedule',
+    "갤러리": 'galleries'
+}
+
+# Results shown per page; "더 보기" fetches the next page
+SEARCH_PAGE_SIZE = 20
+
+# Length of content snippets, and how much of it comes before the match
+SNIPPET_LENGTH = 100
+SNIPPET_CONTEXT = 30
+
+@lru_cache(maxsize=256)
+def highlight_pattern(query):
+    # Longest words first, so overlapping words mark the longer match
+    words = sorted(set(query.split()), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
 
 class SearchSystem:
     def __init__(self):
@@ -16,258 +40,163 @@ class SearchSystem:
             search_query = st.text_input("🔍 검색어를 입력하세요", placeholder="게시글, 과제, 채팅, 일정 등을 검색할 수 있습니다")
         
         with col2:
-            search_type = st.selectbox("검색 범위", ["전체", "게시판", "채팅", "과제", "일정", "갤러리"])
+            search_type = st.selectbox("검색 범위", ["전체"] + list(SEARCH_TABLES))
+        
+        # Also match words one jamo away from the typed ones (typos)
+        fuzzy = st.checkbox("오타 허용 검색", help="철자가 조금 틀려도 비슷한 단어를 찾아줍니다")
         
         if search_query:
-            # Advanced search options
+            # Advanced search options; passed to the search engine as
+            # predicates, so filtered searches only score the rows they keep
+            filters = {'fuzzy': fuzzy} if fuzzy else {}
             with st.expander("🔧 고급 검색 옵션"):
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
                     date_filter = st.checkbox("날짜 범위 필터")
                     if date_filter:
-                        start_date = st.date_input("시작 날짜")
-                        end_date = st.date_input("종료 날짜")
+                        filters['start'] = st.date_input("시작 날짜")
+                        filters['end'] = st.date_input("종료 날짜")
                 
                 with col2:
                     club_filter = st.checkbox("동아리 필터")
                     if club_filter:
                         clubs_df = st.session_state.data_manager.load_csv('clubs')
                         selected_clubs = st.multiselect("동아리 선택", clubs_df['name'].tolist())
+                        if selected_clubs:
+                            filters['clubs'] = set(selected_clubs)
                 
                 with col3:
                     author_filter = st.checkbox("작성자 필터")
                     if author_filter:
                         accounts_df = st.session_state.data_manager.load_csv('accounts')
                         selected_authors = st.multiselect("작성자 선택", accounts_df['username'].tolist())
+                        if selected_authors:
+                            filters['authors'] = set(selected_authors)
             
-            # Perform search
-            results = self.perform_search(search_query, search_type, user)
+            # Perform search; more pages of hits are fetched on demand
+            pages_key = f"search_pages_{search_type}_{search_query}_{sorted(map(str, filters.items()))}"
+            results, cursor, total = self.perform_search(search_query, search_type, user, **filters)
+            for _ in range(st.session_state.get(pages_key, 1) - 1):
+                if cursor is None:
+                    break
+                more_results, cursor, _ = self.perform_search(search_query, search_type, user, after=cursor, **filters)
+                results.extend(more_results)
             
             if results:
-                st.markdown(f"### 검색 결과 ({len(results)}개)")
-                
-                # Filter results based on advanced options
-                if 'date_filter' in locals() and date_filter:
-                    results = self.filter_by_date(results, start_date, end_date)
-                
-                if 'club_filter' in locals() and club_filter and selected_clubs:
-                    results = self.filter_by_club(results, selected_clubs)
-                
-                if 'author_filter' in locals() and author_filter and selected_authors:
-                    results = self.filter_by_author(results, selected_authors)
+                st.markdown(f"### 검색 결과 ({total}개)")
                 
                 # Display results
                 self.display_search_results(results, search_query)
+                
+                if cursor is not None and st.button("더 보기", key=f"{pages_key}_more"):
+                    st.session_state[pages_key] = st.session_state.get(pages_key, 1) + 1
+                    st.rerun()
             else:
                 st.info("검색 결과가 없습니다.")
     
-    def perform_search(self, query, search_type, user):
-        results = []
-        
-        # Search in posts
-        if search_type in ["전체", "게시판"]:
-            posts_results = self.search_posts(query, user)
-            results.extend(posts_results)
-        
-        # Search in chat
-        if search_type in ["전체", "채팅"]:
-            chat_results = self.search_chat(query, user)
-            results.extend(chat_results)
-        
-        # Search in assignments
-        if search_type in ["전체", "과제"]:
-            assignment_results = self.search_assignments(query, user)
-            results.extend(assignment_results)
-        
-        # Search in schedule
-        if search_type in ["전체", "일정"]:
-            schedule_results = self.search_schedule(query, user)
-            results.extend(schedule_results)
-        
-        # Search in gallery
-        if search_type in ["전체", "갤러리"]:
-            gallery_results = self.search_gallery(query, user)
-            results.extend(gallery_results)
-        
-        return results
-    
-    def search_posts(self, query, user):
-        posts_df = st.session_state.data_manager.load_csv('posts')
+    def perform_search(self, query, search_type, user, limit=SEARCH_PAGE_SIZE, after=None, clubs=None, authors=None, start=None, end=None, fuzzy=False):
+        """The limit best-scoring results across the tables of search_type,
+        the cursor for the next page (None when there is none) and the total
+        number of matches. clubs, authors and the start/end dates narrow the
+        search inside the index; fuzzy also matches misspelled words."""
+        tables = list(SEARCH_TABLES.values()) if search_type == "전체" else [SEARCH_TABLES[search_type]]
+        data_manager = st.session_state.data_manager
+        
+        visible = data_manager.visible_clubs(user)
+        if clubs is None:
+            clubs = visible
+        elif visible is not None:
+            clubs = set(clubs) & visible
+        
+        hits, cursor, total = get_search_index(data_manager).top_hits(
+            data_manager, tables, query, limit, after,
+            clubs=clubs,
+            authors=authors,
+            start=start,
+            end=end,
+            # Deleted chat messages are only shown to admins
+            include_deleted=user['role'] == '선생님',
+            fuzzy=fuzzy
+        )
+        
+        # Result cards are only built for the hits on this page
         results = []
-        
-        if posts_df.empty:
-            return results
-        
-        # Filter by user's club access
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            posts_df = posts_df[posts_df['club'].isin(user_club_names)]
-        
-        # Search in title and content
-        for _, post in posts_df.iterrows():
-            if (query.lower() in post['title'].lower() or 
-                query.lower() in post['content'].lower()):
-                
-                results.append({
-                    'type': '게시글',
-                    'title': post['title'],
-                    'content': post['content'][:100] + '...' if len(post['content']) > 100 else post['content'],
-                    'author': post['author'],
-                    'club': post['club'],
-                    'date': post['timestamp'],
-                    'icon': '📝'
-                })
-        
-        return results
+        for table, row, offsets, terms in hits:
+            result = self.build_result(table, row, offsets)
+            # What to highlight, including the spellings fuzzy search matched
+            result['terms'] = ' '.join(terms)
+            results.append(result)
+        return results, cursor, total
     
-    def search_chat(self, query, user):
-        chat_df = st.session_state.data_manager.load_csv('chat_logs')
-        results = []
-        
-        if chat_df.empty:
-            return results
-        
-        # Filter by user's club access
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            chat_df = chat_df[chat_df['club'].isin(user_club_names)]
-        
-        # Filter out deleted messages for non-admins
-        if user['role'] != '선생님':
-            chat_df = chat_df[chat_df['deleted'] == False]
-        
-        # Search in messages
-        for _, message in chat_df.iterrows():
-            if query.lower() in message['message'].lower():
-                results.append({
-                    'type': '채팅',
-                    'title': f"채팅 메시지 - {message['club']}",
-                    'content': message['message'],
-                    'author': message['username'],
-                    'club': message['club'],
-                    'date': message['timestamp'],
-                    'icon': '💬'
-                })
-        
-        return results
+    def build_result(self, table, row, offsets=None):
+        # offsets: where the query first matches each text field, so the
+        # content snippet shows the match instead of the field's start
+        offsets = offsets or [-1, -1]
+        
+        if table == 'posts':
+            return {
+                'type': '게시글',
+                'title': row['title'],
+                'content': self.snippet(row['content'], offsets[1]),
+                'author': row['author'],
+                'club': row['club'],
+                'date': row['date_value'],
+                'icon': '📝'
+            }
+        
+        if table == 'chat_logs':
+            return {
+                'type': '채팅',
+                'title': f"채팅 메시지 - {row['club']}",
+                'content': row['message'],
+                'author': row['author'],
+                'club': row['club'],
+                'date': row['date_value'],
+                'icon': '💬'
+            }
+        
+        if table == 'assignments':
+            return {
+                'type': '과제',
+                'title': row['title'],
+                'content': self.snippet(row['description'], offsets[1]),
+                'author': row['author'],
+                'club': row['club'],
+                'date': row['date_value'],
+                'icon': '📝'
+            }
+        
+        if table == 'schedule':
+            return {
+                'type': '일정',
+                'title': row['title'],
+                'content': str(row['description']),
+                'author': row['author'],
+                'club': row['club'],
+                'date': row['date_value'].strftime('%Y-%m-%d'),
+                'icon': '📅'
+            }
+        
+        return {
+            'type': '갤러리',
+            'title': row['title'],
+            'content': self.snippet(row['description'], offsets[1]),
+            'author': row['author'],
+            'club': row['club'],
+            'date': row['date_value'],
+            'icon': '🖼️'
+        }
     
-    def search_assignments(self, query, user):
-        assignments_df = st.session_state.data_manager.load_csv('assignments')
-        results = []
-        
-        if assignments_df.empty:
-            return results
-        
-        # Filter by user's club access
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            assignments_df = assignments_df[assignments_df['club'].isin(user_club_names)]
-        
-        # Search in title and description
-        for _, assignment in assignments_df.iterrows():
-            if (query.lower() in assignment['title'].lower() or 
-                query.lower() in assignment['description'].lower()):
-                
-                results.append({
-                    'type': '과제',
-                    'title': assignment['title'],
-                    'content': assignment['description'][:100] + '...' if len(assignment['description']) > 100 else assignment['description'],
-                    'author': assignment['creator'],
-                    'club': assignment['club'],
-                    'date': assignment['created_date'],
-                    'icon': '📝'
-                })
-        
-        return results
-    
-    def search_schedule(self, query, user):
-        schedule_df = st.session_state.data_manager.load_csv('schedule')
-        results = []
-        
-        if schedule_df.empty:
-            return results
-        
-        # Filter by user's club access
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            schedule_df = schedule_df[schedule_df['club'].isin(user_club_names)]
-        
-        # Search in title and description
-        for _, event in schedule_df.iterrows():
-            if (query.lower() in event['title'].lower() or 
-                query.lower() in str(event['description']).lower()):
-                
-                results.append({
-                    'type': '일정',
-                    'title': event['title'],
-                    'content': str(event['description']),
-                    'author': event['creator'],
-                    'club': event['club'],
-                    'date': event['date'],
-                    'icon': '📅'
-                })
-        
-        return results
-    
-    def search_gallery(self, query, user):
-        gallery_df = st.session_state.data_manager.load_csv('galleries')
-        results = []
-        
-        if gallery_df.empty:
-            return results
-        
-        # Filter by user's club access
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            gallery_df = gallery_df[gallery_df['club'].isin(user_club_names)]
-        
-        # Search in title and description
-        for _, artwork in gallery_df.iterrows():
-            if (query.lower() in artwork['title'].lower() or 
-                query.lower() in artwork['description'].lower()):
-                
-                results.append({
-                    'type': '갤러리',
-                    'title': artwork['title'],
-                    'content': artwork['description'][:100] + '...' if len(artwork['description']) > 100 else artwork['description'],
-                    'author': artwork['author'],
-                    'club': artwork['club'],
-                    'date': artwork['created_date'],
-                    'icon': '🖼️'
-                })
-        
-        return results
-    
-    def filter_by_date(self, results, start_date, end_date):
-        filtered_results = []
-        
-        for result in results:
-            try:
-                # Try to parse the date
-                if isinstance(result['date'], str):
-                    result_date = pd.to_datetime(result['date']).date()
-                else:
-                    result_date = result['date']
-                
-                if start_date <= result_date <= end_date:
-                    filtered_results.append(result)
-            except:
-                # If date parsing fails, include the result
-                filtered_results.append(result)
+    def snippet(self, text, offset=-1):
+        """SNIPPET_LENGTH characters of text around offset (from its start
+        when the match is elsewhere), with ... marking cut ends"""
+        if len(text) <= SNIPPET_LENGTH:
+            return text
         
-        return filtered_results
-    
-    def filter_by_club(self, results, selected_clubs):
-        return [result for result in results if result['club'] in selected_clubs]
-    
-    def filter_by_author(self, results, selected_authors):
-        return [result for result in results if result['author'] in selected_authors]
+        start = 0 if offset < 0 else min(max(0, offset - SNIPPET_CONTEXT), len(text) - SNIPPET_LENGTH)
+        end = start + SNIPPET_LENGTH
+        return ('...' if start > 0 else '') + text[start:end] + ('...' if end < len(text) else '')
     
     def display_search_results(self, results, query):
         if not results:
@@ -289,8 +218,9 @@ class SearchSystem:
             for result in type_results:
                 with st.container():
                     # Highlight search terms
-                    highlighted_title = self.highlight_search_terms(result['title'], query)
-                    highlighted_content = self.highlight_search_terms(result['content'], query)
+                    terms = result.get('terms', query)
+                    highlighted_title = self.highlight_search_terms(result['title'], terms)
+                    highlighted_content = self.highlight_search_terms(result['content'], terms)
                     
                     st.markdown(f"""
                     <div class="club-card">
@@ -311,7 +241,13 @@ class SearchSystem:
         if not query or not text:
             return text
         
-        # Simple highlighting - wrap matching terms in bold
-        pattern = re.compile(re.escape(query), re.IGNORECASE)
-        highlighted = pattern.sub(f'<mark style="background-color: #ffeb3b; padding: 2px 4px; border-radius: 3px;">{query}</mark>', text)
-        return highlighted
\ No newline at end of file
+        # Every query word is marked in one pass; the text between matches is
+        # escaped, since snippets may cut through markup
+        pieces = []
+        position = 0
+        for match in highlight_pattern(' '.join(query.lower().split())).finditer(text):
+            pieces.append(html.escape(text[position:match.start()]))
+            pieces.append(f'<mark style="background-color: #ffeb3b; padding: 2px 4px; border-radius: 3px;">{html.escape(match.group())}</mark>')
+            position = match.end()
+        pieces.append(html.escape(text[position:]))
+        return ''.join(pieces)
@@ -0,0 +1,178 @@
+import pandas as pd
+import os
+import io
+import zlib
+import queue
+import threading
+from schemas import apply_schema, csv_dtypes
+
+# pyarrow is optional; without it history tables are read straight from CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Append-only history tables that get a columnar snapshot; snapshots are
+# stored with the table's schema dtypes (see schemas.TABLE_SCHEMAS)
+SNAPSHOT_TABLES = ['chat_logs', 'attendance', 'notification_reads', 'quiz_attempts']
+
+# Tables smaller than this are cheap enough to parse directly
+MIN_SNAPSHOT_BYTES = 64 * 1024
+# Compact once this many bytes have been appended after the snapshot
+COMPACT_TAIL_BYTES = 256 * 1024
+# Bytes before the snapshot offset that must still match the CSV
+CHECK_BYTES = 4096
+
+_compaction_queue = queue.Queue()
+_pending_compactions = set()
+_compaction_lock = threading.Lock()
+_compaction_thread = None
+
+class SnapshotStore:
+    def __init__(self, data_dir):
+        self.snapshot_dir = os.path.join(data_dir, 'snapshots')
+    
+    def enabled(self, table):
+        return pq is not None and table in SNAPSHOT_TABLES
+    
+    def snapshot_path(self, table):
+        return os.path.join(self.snapshot_dir, f'{table}.parquet')
+    
+    def read(self, table, csv_path, columns=None):
+        """Snapshot rows plus the CSV tail appended after it, or None when
+        the table has no usable snapshot"""
+        if not self.enabled(table):
+            return None
+        
+        csv_size = os.path.getsize(csv_path)
+        snapshot_path = self.snapshot_path(table)
+        
+        try:
+            offset = self.valid_offset(snapshot_path, csv_path, csv_size)
+        except Exception as e:
+            print(f"Snapshot check error: {e}")
+            offset = None
+        
+        if offset is None:
+            if csv_size >= MIN_SNAPSHOT_BYTES:
+                self.schedule(table, csv_path)
+            return None
+        
+        if csv_size - offset >= COMPACT_TAIL_BYTES:
+            self.schedule(table, csv_path)
+        
+        try:
+            df = pq.read_table(snapshot_path, columns=columns, memory_map=True).to_pandas()
+            
+            tail = self.read_tail(table, csv_path, offset, columns)
+            if tail is not None and not tail.empty:
+                df = pd.concat([df, tail], ignore_index=True)
+            return df
+        except Exception as e:
+            print(f"Snapshot read error: {e}")
+            return None
+    
+    def valid_offset(self, snapshot_path, csv_path, csv_size):
+        if not os.path.exists(snapshot_path):
+            return None
+        
+        metadata = pq.read_schema(snapshot_path).metadata or {}
+        if b'csv_offset' not in metadata:
+            return None
+        
+        offset = int(metadata[b'csv_offset'])
+        if offset > csv_size:
+            return None
+        
+        # Rewrites replace the file, so a snapshot of an earlier CSV (even one
+        # compacted while the rewrite happened) has a different inode
+        if int(metadata.get(b'csv_inode', -1)) != os.stat(csv_path).st_ino:
+            return None
+        
+        # A rewritten CSV no longer starts with the bytes the snapshot covers
+        with open(csv_path, 'rb') as f:
+            start = max(0, offset - CHECK_BYTES)
+            f.seek(start)
+            if zlib.crc32(f.read(offset - start)) != int(metadata[b'csv_crc']):
+                return None
+        
+        return offset
+    
+    def read_tail(self, table, csv_path, offset, columns=None):
+        with open(csv_path, 'rb') as f:
+            header = f.readline()
+            f.seek(offset)
+            tail = f.read()
+        
+        if not tail.strip():
+            return None
+        
+        return pd.read_csv(
+            io.BytesIO(header + tail),
+            encoding='utf-8-sig',
+            dtype=csv_dtypes(table, columns),
+            usecols=columns
+        )
+    
+    def compact(self, table, csv_path):
+        with open(csv_path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            data = f.read()
+        
+        # Only snapshot whole lines; a concurrent append may be mid-write
+        offset = data.rfind(b'\n') + 1
+        if offset == 0:
+            return
+        
+        df = pd.read_csv(io.BytesIO(data[:offset]), encoding='utf-8-sig', dtype=csv_dtypes(table))
+        df = apply_schema(table, df)
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        arrow_table = arrow_table.replace_schema_metadata({
+            **(arrow_table.schema.metadata or {}),
+            b'csv_offset': str(offset).encode(),
+            b'csv_inode': str(inode).encode(),
+            b'csv_crc': str(zlib.crc32(data[max(0, offset - CHECK_BYTES):offset])).encode()
+        })
+        
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        snapshot_path = self.snapshot_path(table)
+        tmp_path = snapshot_path + '.tmp'
+        pq.write_table(arrow_table, tmp_path)
+        
+        # The table was rewritten while compacting; this snapshot is stale
+        if os.stat(csv_path).st_ino != inode:
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, snapshot_path)
+    
+    def invalidate(self, table):
+        if os.path.exists(self.snapshot_path(table)):
+            os.remove(self.snapshot_path(table))
+    
+    def schedule(self, table, csv_path):
+        global _compaction_thread
+        
+        with _compaction_lock:
+            if (table, csv_path) in _pending_compactions:
+                return
+            _pending_compactions.add((table, csv_path))
+            
+            if _compaction_thread is None or not _compaction_thread.is_alive():
+                _compaction_thread = threading.Thread(target=run_compactions, daemon=True)
+                _compaction_thread.start()
+        
+        _compaction_queue.put((self, table, csv_path))
+
+def run_compactions():
+    # Background worker; keeps snapshot rebuilds off the Streamlit script thread
+    while True:
+        store, table, csv_path = _compaction_queue.get()
+        try:
+            store.compact(table, csv_path)
+        except Exception as e:
+            print(f"Snapshot compaction error: {e}")
+        finally:
+            with _compaction_lock:
+                _pending_compactions.discard((table, csv_path))
@@ -0,0 +1,281 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+import sqlite3
+import threading
+from datetime import date, datetime
+from schemas import csv_dtypes
+
+# Secondary indexes for the lookups the app repeats on every render
+TABLE_INDEXES = {
+    'accounts': [('username',)],
+    'user_clubs': [('username',), ('club_name',)],
+    'posts': [('club', 'timestamp')],
+    'chat_logs': [('club', 'timestamp')],
+    'assignments': [('club',)],
+    'submissions': [('assignment_id', 'username'), ('username',)],
+    'attendance': [('club', 'date'), ('username',)],
+    'schedule': [('club', 'date')],
+    'points': [('username',)],
+    'votes': [('club',)],
+    'vote_responses': [('vote_id', 'username'), ('username',)],
+    'quizzes': [('club',)],
+    'quiz_attempts': [('quiz_id', 'username'), ('username',)],
+    'galleries': [('club',)],
+    'gallery_comments': [('gallery_id',)],
+    'notifications': [('recipient',)],
+    'notification_reads': [('notification_id', 'username'), ('username',)],
+    'user_notification_settings': [('username',)],
+    'reports': [('club',)]
+}
+
+class SQLiteStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.columns = {}
+    
+    def connect(self):
+        # sqlite3 connections can't be shared between Streamlit script threads
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+    
+    def create_tables(self, table_columns):
+        conn = self.connect()
+        with conn:
+            # Per-table write counters for DataManager.update's version check
+            conn.execute('CREATE TABLE IF NOT EXISTS "_versions" ("name" TEXT PRIMARY KEY, "version" INTEGER NOT NULL)')
+            
+            for table, column_list in table_columns.items():
+                column_defs = ', '.join(
+                    f'"{col}" INTEGER' if col == 'id' else f'"{col}"' for col in column_list
+                )
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({column_defs})')
+                
+                if 'id' in column_list:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_id" ON "{table}" ("id")')
+                
+                for index_columns in TABLE_INDEXES.get(table, []):
+                    index_name = f'idx_{table}_' + '_'.join(index_columns)
+                    column_sql = ', '.join(f'"{col}"' for col in index_columns)
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table}" ({column_sql})')
+        
+        self.columns.clear()
+    
+    def get_columns(self, table):
+        if table not in self.columns:
+            rows = self.connect().execute(f'PRAGMA table_info("{table}")').fetchall()
+            self.columns[table] = [row[1] for row in rows]
+        return self.columns[table]
+    
+    def ensure_columns(self, conn, table, column_list):
+        existing = self.get_columns(table)
+        for col in column_list:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+                existing.append(col)
+    
+    def to_sql_value(self, value):
+        if value is None or value is pd.NaT or value is pd.NA:
+            return None
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        if isinstance(value, (pd.Timestamp, datetime, date)):
+            return str(value)
+        return value
+    
+    def load(self, table, columns=None):
+        if not self.get_columns(table):
+            return pd.DataFrame()
+        
+        column_sql = ', '.join(f'"{col}"' for col in self.check_columns(table, columns)) if columns else '*'
+        return pd.read_sql_query(f'SELECT {column_sql} FROM "{table}" ORDER BY rowid', self.connect())
+    
+    def save(self, table, df):
+        conn = self.connect()
+        with conn:
+            self.ensure_columns(conn, table, list(df.columns))
+            conn.execute(f'DELETE FROM "{table}"')
+            self.insert(conn, table, list(df.columns), df.itertuples(index=False, name=None))
+            self.bump_version(conn, table)
+        return True
+    
+    def append(self, table, records):
+        column_list = []
+        for record in records:
+            column_list.extend(col for col in record if col not in column_list)
+        
+        conn = self.connect()
+        with conn:
+            self.ensure_columns(conn, table, column_list)
+            rows = ([record.get(col) for col in column_list] for record in records)
+            self.insert(conn, table, column_list, rows)
+            self.bump_version(conn, table)
+        return True
+    
+    def insert(self, conn, table, column_list, rows):
+        column_sql = ', '.join(f'"{col}"' for col in column_list)
+        placeholders = ', '.join('?' for _ in column_list)
+        conn.executemany(
+            f'INSERT INTO "{table}" ({column_sql}) VALUES ({placeholders})',
+            ([self.to_sql_value(value) for value in row] for row in rows)
+        )
+    
+    def update_by_id(self, table, row_id, changes):
+        # Patch one row through the id index; callables get the current value
+        self.check_columns(table, list(changes))
+        row_id = self.to_sql_value(row_id)
+        
+        conn = self.connect()
+        with conn:
+            functions = [col for col, value in changes.items() if callable(value)]
+            if functions:
+                column_sql = ', '.join(f'"{col}"' for col in functions)
+                row = conn.execute(f'SELECT {column_sql} FROM "{table}" WHERE "id" = ? LIMIT 1', (row_id,)).fetchone()
+                if row is None:
+                    return False
+                changes = {**changes, **{col: changes[col](value) for col, value in zip(functions, row)}}
+            
+            assignments = ', '.join(f'"{col}" = ?' for col in changes)
+            cursor = conn.execute(
+                f'UPDATE "{table}" SET {assignments} WHERE "id" = ?',
+                [self.to_sql_value(value) for value in changes.values()] + [row_id]
+            )
+            if cursor.rowcount == 0:
+                return False
+            self.bump_version(conn, table)
+        return True
+    
+    def bump_version(self, conn, table):
+        conn.execute(
+            'INSERT INTO "_versions" ("name", "version") VALUES (?, 1) '
+            'ON CONFLICT ("name") DO UPDATE SET "version" = "version" + 1',
+            (table,)
+        )
+    
+    def version(self, table):
+        row = self.connect().execute('SELECT "version" FROM "_versions" WHERE "name" = ?', (table,)).fetchone()
+        return row[0] if row else 0
+    
+    def check_columns(self, table, column_list):
+        # Column names are interpolated into SQL, so only allow known ones
+        known = self.get_columns(table)
+        for col in column_list:
+            if col not in known:
+                raise KeyError(f"Unknown column '{col}' in table '{table}'")
+        return column_list
+    
+    def query(self, table, where=None, order_by=None, limit=None, columns=None):
+        """Indexed lookup; where maps column -> value (lists/sets mean IN),
+        order_by takes column names with a '-' prefix for descending order"""
+        if not self.get_columns(table):
+            return pd.DataFrame()
+        
+        column_sql = ', '.join(f'"{col}"' for col in self.check_columns(table, columns)) if columns else '*'
+        sql = f'SELECT {column_sql} FROM "{table}"'
+        clauses, params = self.where_clauses(table, where)
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        
+        if order_by:
+            if isinstance(order_by, str):
+                order_by = [order_by]
+            terms = []
+            for col in order_by:
+                descending = col.startswith('-')
+                col = col.lstrip('-')
+                self.check_columns(table, [col])
+                terms.append(f'"{col}" DESC' if descending else f'"{col}"')
+            sql += ' ORDER BY ' + ', '.join(terms)
+        
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        
+        return pd.read_sql_query(sql, self.connect(), params=params)
+    
+    def where_clauses(self, table, where):
+        clauses = []
+        params = []
+        for col, value in (where or {}).items():
+            self.check_columns(table, [col])
+            if isinstance(value, (list, tuple, set, frozenset)):
+                values = [self.to_sql_value(v) for v in value]
+                if not values:
+                    clauses.append('0')
+                    continue
+                clauses.append(f'"{col}" IN ({", ".join("?" for _ in values)})')
+                params.extend(values)
+            else:
+                clauses.append(f'"{col}" = ?')
+                params.append(self.to_sql_value(value))
+        return clauses, params
+    
+    def page(self, table, column, descending, cursor, limit, where=None):
+        """Keyset page ordered by (column, id); cursor is the (value, id) of
+        the last row of the previous page"""
+        if not self.get_columns(table):
+            return pd.DataFrame()
+        
+        self.check_columns(table, [column, 'id'])
+        clauses, params = self.where_clauses(table, where)
+        
+        if cursor is not None:
+            op = '<' if descending else '>'
+            clauses.append(f'("{column}" {op} ? OR ("{column}" = ? AND "id" {op} ?))')
+            params.extend([self.to_sql_value(cursor[0]), self.to_sql_value(cursor[0]), self.to_sql_value(cursor[1])])
+        
+        direction = 'DESC' if descending else 'ASC'
+        sql = f'SELECT * FROM "{table}"'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f' ORDER BY "{column}" {direction}, "id" {direction} LIMIT ?'
+        params.append(int(limit))
+        
+        return pd.read_sql_query(sql, self.connect(), params=params)
+    
+    def rows_after(self, table, row_id):
+        # Rows appended after row_id, in id order
+        if not self.get_columns(table):
+            return pd.DataFrame()
+        return pd.read_sql_query(
+            f'SELECT * FROM "{table}" WHERE "id" > ? ORDER BY "id"', self.connect(), params=[self.to_sql_value(row_id)]
+        )
+
+def migrate_csv_directory(data_dir, db_path, table_columns):
+    """One-shot import of every table CSV in data_dir into a SQLite database"""
+    store = SQLiteStore(db_path)
+    store.create_tables(table_columns)
+    
+    migrated = {}
+    for table in table_columns:
+        filepath = os.path.join(data_dir, f'{table}.csv')
+        if not os.path.exists(filepath):
+            continue
+        
+        try:
+            df = pd.read_csv(filepath, encoding='utf-8-sig', dtype=csv_dtypes(table))
+        except pd.errors.EmptyDataError:
+            continue
+        
+        store.save(table, df)
+        migrated[table] = len(df)
+    
+    return migrated
+
+if __name__ == "__main__":
+    from schemas import TABLE_COLUMNS
+    
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'data'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, 'club.db')
+    
+    for table, row_count in migrate_csv_directory(data_dir, db_path, TABLE_COLUMNS).items():
+        print(f"{table}: {row_count} rows")
@@ -62,13 +62,12 @@ class UIComponents:
         points_df = data_manager.load_csv('points')
         posts_df = data_manager.load_csv('posts')
         submissions_df = data_manager.load_csv('submissions')
-        user_clubs_df = data_manager.load_csv('user_clubs')
         
         # Calculate stats
         total_points = points_df[points_df['username'] == username]['points'].sum() if not points_df.empty else 0
         post_count = len(posts_df[posts_df['author'] == username]) if not posts_df.empty else 0
         submission_count = len(submissions_df[submissions_df['username'] == username]) if not submissions_df.empty else 0
-        club_count = len(user_clubs_df[user_clubs_df['username'] == username]) if not user_clubs_df.empty else 0
+        club_count = len(data_manager.user_club_names(username))
         
         col1, col2, col3, col4 = st.columns(4)
         
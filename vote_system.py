@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
 import json
 
@@ -40,17 +39,14 @@ class VoteSystem:
             return
         
         # Filter votes based on user's clubs
-        if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = ["전체"] + user_clubs['club_name'].tolist()
-            votes_df = votes_df[votes_df['club'].isin(user_club_names)]
+        votes_df = st.session_state.data_manager.filter_visible('votes', votes_df, user)
         
         # Show only active votes
         current_date = datetime.now().date()
         active_votes = []
         
         for _, vote in votes_df.iterrows():
-            end_date = datetime.strptime(vote['end_date'], '%Y-%m-%d').date()
+            end_date = vote['end_date'].date()
             if end_date >= current_date:
                 active_votes.append(vote)
         
@@ -63,16 +59,16 @@ class VoteSystem:
     
     def show_vote_card(self, vote, user):
         # Check if user has voted
-        vote_responses_df = st.session_state.data_manager.load_csv('vote_responses')
-        user_vote = vote_responses_df[
-            (vote_responses_df['vote_id'] == vote['id']) &
-            (vote_responses_df['username'] == user['username'])
-        ]
+        user_vote = st.session_state.data_manager.query(
+            'vote_responses',
+            where={'vote_id': vote['id'], 'username': user['username']},
+            limit=1
+        )
         
         has_voted = not user_vote.empty
         
         # Calculate days left
-        end_date = datetime.strptime(vote['end_date'], '%Y-%m-%d').date()
+        end_date = vote['end_date'].date()
         days_left = (end_date - date.today()).days
         
         status_color = "#28a745" if not has_voted else "#6c757d"
@@ -93,7 +89,7 @@ class VoteSystem:
                     <p>{vote.get('description', '설명이 없습니다.')}</p>
                     <div style="background-color: #f8f9fa; padding: 10px; border-radius: 5px; margin-top: 10px;">
                         <p><strong>🏷️ 동아리:</strong> {vote['club']}</p>
-                        <p><strong>📅 마감일:</strong> {vote['end_date']} ({days_left}일 남음)</p>
+                        <p><strong>📅 마감일:</strong> {vote['end_date'].strftime('%Y-%m-%d')} ({days_left}일 남음)</p>
                         <p><strong>👤 생성자:</strong> {vote['creator']}</p>
                     </div>
                 </div>
@@ -156,9 +152,7 @@ class VoteSystem:
     
     def save_vote_response(self, vote_id, username, selected_option):
         try:
-            vote_responses_df = st.session_state.data_manager.load_csv('vote_responses')
-            
-            new_id = len(vote_responses_df) + 1
+            new_id = st.session_state.data_manager.next_id('vote_responses')
             new_response = {
                 'id': new_id,
                 'vote_id': vote_id,
@@ -167,8 +161,7 @@ class VoteSystem:
                 'voted_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            vote_responses_df = pd.concat([vote_responses_df, pd.DataFrame([new_response])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('vote_responses', vote_responses_df)
+            return st.session_state.data_manager.append_row('vote_responses', new_response)
         
         except Exception as e:
             print(f"Vote response save error: {e}")
@@ -189,8 +182,7 @@ class VoteSystem:
                     clubs_df = st.session_state.data_manager.load_csv('clubs')
                     club_options = ["전체"] + clubs_df['name'].tolist()
                 else:
-                    user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-                    club_options = user_clubs['club_name'].tolist()
+                    club_options = sorted(st.session_state.data_manager.user_club_names(user['username']))
                 
                 selected_club = st.selectbox("대상 동아리", club_options)
             
@@ -228,9 +220,7 @@ class VoteSystem:
     
     def create_vote(self, title, description, club, options, end_date, creator):
         try:
-            votes_df = st.session_state.data_manager.load_csv('votes')
-            
-            new_id = len(votes_df) + 1
+            new_id = st.session_state.data_manager.next_id('votes')
             new_vote = {
                 'id': new_id,
                 'title': title,
@@ -242,8 +232,7 @@ class VoteSystem:
                 'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            votes_df = pd.concat([votes_df, pd.DataFrame([new_vote])], ignore_index=True)
-            return st.session_state.data_manager.save_csv('votes', votes_df)
+            return st.session_state.data_manager.append_row('votes', new_vote)
         
         except Exception as e:
             print(f"Vote creation error: {e}")
@@ -261,8 +250,7 @@ class VoteSystem:
         
         # Filter votes by user's authority
         if user['role'] != '선생님':
-            user_clubs = st.session_state.data_manager.get_user_clubs(user['username'])
-            user_club_names = user_clubs['club_name'].tolist()
+            user_club_names = st.session_state.data_manager.user_club_names(user['username'])
             votes_df = votes_df[
                 (votes_df['club'].isin(user_club_names)) |
                 (votes_df['creator'] == user['username'])
@@ -293,7 +281,7 @@ class VoteSystem:
             response_count = len(vote_responses)
             
             # Check if vote is active
-            end_date = datetime.strptime(vote['end_date'], '%Y-%m-%d').date()
+            end_date = vote['end_date'].date()
             is_active = end_date >= date.today()
             status = "진행중" if is_active else "마감됨"
             status_color = "#28a745" if is_active else "#6c757d"
@@ -313,7 +301,7 @@ class VoteSystem:
                         <p>{vote.get('description', '설명이 없습니다.')}</p>
                         <div style="display: flex; justify-content: space-between; margin: 10px 0;">
                             <span><strong>동아리:</strong> {vote['club']}</span>
-                            <span><strong>마감일:</strong> {vote['end_date']}</span>
+                            <span><strong>마감일:</strong> {vote['end_date'].strftime('%Y-%m-%d')}</span>
                             <span><strong>응답:</strong> {response_count}개</span>
                         </div>
                     </div>
@@ -0,0 +1,134 @@
+import pandas as pd
+import atexit
+import threading
+from contextlib import contextmanager
+from schemas import apply_schema
+
+# Pending writes are flushed at least this often (seconds)...
+FLUSH_INTERVAL = 1.0
+# ...or as soon as this many rows/updates are waiting
+FLUSH_SIZE = 100
+
+class WriteBehindQueue:
+    """Buffers appends and updates per table and writes them from a background
+    thread, one coalesced write per table. Reads through load_csv overlay the
+    pending writes, so this process sees them immediately."""
+    
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+        # table -> [('append', records) | ('update', predicate, changes)]
+        self.pending = {}
+        self.size = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        # Held while a table is flushed so readers never see a write twice
+        self.table_guards = {}
+        self.thread = None
+        atexit.register(self.flush_all)
+    
+    def append(self, table, records):
+        return self.enqueue(table, ('append', list(records)), len(records))
+    
+    def update(self, table, predicate, changes):
+        """Queue an update after trying it on the table with the writes queued
+        ahead of it; like a direct update, returns False when no row matches
+        or the changes can't be applied, and then queues nothing"""
+        # The guard keeps other writes from being queued in between, so the
+        # flush applies the update to the same rows it was tried on
+        with self.guard(table):
+            try:
+                df = self.apply_ops(table, self.data_manager.read_table(table).copy(), self.pending_ops(table))
+                if self.data_manager.apply_changes(df, predicate, changes) is None:
+                    return False
+            except Exception as e:
+                print(f"Update error: {e}")
+                return False
+            return self.enqueue(table, ('update', predicate, changes), 1)
+    
+    def enqueue(self, table, op, size):
+        with self.lock:
+            self.pending.setdefault(table, []).append(op)
+            self.size += size
+            
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            if self.size >= FLUSH_SIZE:
+                self.wakeup.notify()
+        return True
+    
+    @contextmanager
+    def guard(self, table):
+        with self.lock:
+            guard = self.table_guards.setdefault(table, threading.Lock())
+        with guard:
+            yield
+    
+    def read(self, table):
+        with self.guard(table):
+            df = self.data_manager.read_table(table)
+            ops = self.pending_ops(table)
+            
+            if not ops:
+                return df
+            return self.apply_ops(table, df.copy(), ops)
+    
+    def pending_ops(self, table):
+        with self.lock:
+            return list(self.pending.get(table, []))
+    
+    def has_pending(self, table):
+        with self.lock:
+            return bool(self.pending.get(table))
+    
+    def apply_ops(self, table, df, ops):
+        # Changes df in place; callers pass a copy of the cached table
+        for op in ops:
+            if op[0] == 'append':
+                df = apply_schema(table, pd.concat([df, pd.DataFrame(op[1])], ignore_index=True))
+            else:
+                changed = self.data_manager.apply_changes(df, op[1], op[2])
+                if changed is not None:
+                    df = changed
+        return df
+    
+    def flush(self, table):
+        data_manager = self.data_manager
+        
+        # Same order as readers holding the table lock: table lock, then guard
+        with data_manager.table_lock(table), self.guard(table):
+            with self.lock:
+                ops = list(self.pending.get(table, []))
+            if not ops:
+                return True
+            
+            if all(op[0] == 'append' for op in ops):
+                records = [record for op in ops for record in op[1]]
+                saved = data_manager.write_rows(table, records)
+            else:
+                df = self.apply_ops(table, data_manager.read_table(table).copy(), ops)
+                saved = data_manager.write_table(table, df)
+            
+            # Failed writes stay queued and are retried on the next flush
+            if saved:
+                with self.lock:
+                    del self.pending[table][:len(ops)]
+                    self.size -= sum(len(op[1]) if op[0] == 'append' else 1 for op in ops)
+            return saved
+    
+    def flush_all(self):
+        with self.lock:
+            tables = [table for table, ops in self.pending.items() if ops]
+        
+        for table in tables:
+            try:
+                self.flush(table)
+            except Exception as e:
+                print(f"Write-behind flush error: {e}")
+    
+    def run(self):
+        # Background writer; keeps disk I/O off the Streamlit script thread
+        while True:
+            with self.lock:
+                self.wakeup.wait(FLUSH_INTERVAL)
+            self.flush_all()